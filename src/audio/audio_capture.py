@@ -159,18 +159,22 @@ class AudioCapture:
     def _process_audio(self) -> None:
         """Process audio in a background thread."""
         while self.is_recording:
-            # If we have data and a callback for audio levels
-            if self.audio_buffer and self.audio_level_callback:
+            # The level is needed for the level callback and for continuous-mode
+            # speech detection; skip the work entirely when neither wants it
+            level_callback = self.audio_level_callback
+            continuous = self.continuous_mode and self.chunk_processing_callback
+            if self.audio_buffer and (level_callback or continuous):
                 # Calculate audio level from the latest chunk
                 latest_chunk = self.audio_buffer[-1]
                 audio_array = np.frombuffer(latest_chunk, dtype=np.int16)
                 audio_level = self._calculate_audio_level(audio_array)
 
                 # Call the callback with the audio level
-                self.audio_level_callback(audio_level)
+                if level_callback:
+                    level_callback(audio_level)
                 
                 # Handle continuous mode processing if enabled
-                if self.continuous_mode and self.chunk_processing_callback:
+                if continuous:
                     self._handle_continuous_processing(audio_array, audio_level)
 
             # Sleep to avoid using too much CPU
@@ -190,8 +194,11 @@ class AudioCapture:
         if len(audio_array) == 0:
             return 0.0
 
+        # Sum of squares as a single dot product avoids the squared temporary
+        samples = audio_array.astype(np.float32)
+        rms = np.sqrt(np.dot(samples, samples) / len(samples))
+
         # Normalize to range 0.0 - 1.0
-        rms = np.sqrt(np.mean(np.square(audio_array.astype(np.float32))))
         normalized = min(1.0, rms / 32768.0)  # 16-bit max value is 32768
 
         return normalized
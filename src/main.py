@@ -148,14 +148,15 @@ class AudioInputHandler(QObject):
             transcription: The transcribed text
             confidence: Confidence score from 0.0 to 1.0 (default: 0.7)
         """
-        if not transcription:
-            return
-            
-        # Update processing status for non-continuous mode
+        # Update processing status for non-continuous mode, including when the
+        # voice-activity gate reports an empty result
         if not self.continuous_mode:
             self.is_processing = False
             self.processing_status_changed.emit(False)
 
+        if not transcription:
+            return
+
         # Emit signal with recognized Japanese text and confidence
         self.speech_detected.emit(transcription, confidence)
 
@@ -0,0 +1,153 @@
+"""
+Single-producer/single-consumer audio ring buffer for continuous STT.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class SPSCAudioRing:
+    """
+    Lock-free ring of variable-length audio segments.
+
+    Samples are stored as float32 in one preallocated array, alongside a
+    small ring of (start, length) records. Exactly one thread may push and
+    exactly one thread may pop. Each index is written by only one side and
+    published with a plain attribute store after the data it covers, which
+    is safe under the GIL without a mutex.
+    """
+
+    def __init__(self, capacity_samples: int = 30 * 16000, max_segments: int = 32):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity_samples: Total samples that may be queued at once
+            max_segments: Maximum number of queued segments, rounded up to a
+                power of two so slots can be indexed with a mask
+        """
+        self.capacity_samples = capacity_samples
+        self.max_segments = 1 << max(0, max_segments - 1).bit_length()
+        self._mask = self.max_segments - 1
+
+        self._samples = np.empty(capacity_samples, dtype=np.float32)
+        self._starts = np.zeros(self.max_segments, dtype=np.int64)
+        self._lengths = np.zeros(self.max_segments, dtype=np.int64)
+
+        # Producer-owned counters
+        self._tail = 0           # Segments published
+        self._written = 0        # Samples written
+        # Consumer-owned counters
+        self._head = 0           # Segments consumed
+        self._read = 0           # Samples released
+
+    def push(self, audio_chunk: np.ndarray) -> bool:
+        """
+        Copy an audio chunk into the ring (producer side).
+
+        int16 input is scaled to [-1, 1] while it is copied, other dtypes
+        are peak-normalized as before.
+
+        Args:
+            audio_chunk: Mono audio samples
+
+        Returns:
+            bool: True if queued, False if the ring is full
+        """
+        n = len(audio_chunk)
+        tail = self._tail
+        if tail - self._head >= self.max_segments:
+            return False
+        if n > self.capacity_samples - (self._written - self._read):
+            return False
+
+        if audio_chunk.dtype not in (np.int16, np.float32):
+            audio_chunk = audio_chunk.astype(np.float32)
+            audio_chunk /= max(np.max(np.abs(audio_chunk)), 1e-10)
+
+        start = self._written
+        pos = start % self.capacity_samples
+        first = min(n, self.capacity_samples - pos)
+        self._copy_in(self._samples[pos:pos + first], audio_chunk[:first])
+        if first < n:
+            self._copy_in(self._samples[:n - first], audio_chunk[first:])
+
+        slot = tail & self._mask
+        self._starts[slot] = start
+        self._lengths[slot] = n
+        self._written = start + n
+
+        # Publish last so the consumer never sees a partially written segment
+        self._tail = tail + 1
+        return True
+
+    def pop(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Remove the oldest segment (consumer side).
+
+        Args:
+            out: Optional float32 scratch buffer to copy into; must hold at
+                least capacity_samples samples. The returned array is then a
+                view of it, valid until the next pop into the same buffer.
+
+        Returns:
+            Optional[np.ndarray]: float32 samples, or None if empty
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+
+        slot = head & self._mask
+        start = int(self._starts[slot])
+        n = int(self._lengths[slot])
+
+        pos = start % self.capacity_samples
+        first = min(n, self.capacity_samples - pos)
+        out = np.empty(n, dtype=np.float32) if out is None else out[:n]
+        out[:first] = self._samples[pos:pos + first]
+        if first < n:
+            out[first:] = self._samples[:n - first]
+
+        self._read = start + n
+        self._head = head + 1
+        return out
+
+    def peek_size(self) -> Optional[int]:
+        """
+        Return the sample count of the oldest segment without removing it.
+
+        Returns:
+            Optional[int]: Segment length, or None if empty
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+        return int(self._lengths[head & self._mask])
+
+    def clear(self) -> None:
+        """Discard all queued segments (consumer side)."""
+        while self._head != self._tail:
+            slot = self._head & self._mask
+            self._read = int(self._starts[slot] + self._lengths[slot])
+            self._head += 1
+
+    def size(self) -> int:
+        """Return the number of queued segments."""
+        return self._tail - self._head
+
+    def qsize(self) -> int:
+        """Return the number of queued segments (queue.Queue compatible alias)."""
+        return self.size()
+
+    def empty(self) -> bool:
+        """Return True if no segments are queued."""
+        return self._tail == self._head
+
+    @staticmethod
+    def _copy_in(dst: np.ndarray, src: np.ndarray) -> None:
+        """Copy samples into the ring, scaling int16 in the same pass."""
+        if src.dtype == np.int16:
+            np.multiply(src, np.float32(1.0 / 32768.0), out=dst)
+        else:
+            dst[:] = src
@@ -3,12 +3,15 @@ Whisper STT module for Japanese speech recognition.
 """
 
 import os
+import shutil
 import time
 import threading
 import numpy as np
 import whisper  # This is openai-whisper package
-from typing import Optional, Callable, List, Dict, Any, Tuple
-import queue
+from typing import Optional, Callable, List, Dict, Any, Set, Tuple
+from concurrent.futures import Future
+
+from .ring_buffer import SPSCAudioRing
 
 # Try to import CTranslate2 Whisper for better performance
 try:
@@ -19,6 +22,33 @@ except ImportError:
     CTRANSLATE2_AVAILABLE = False
     print("CTranslate2 not available. Using standard Whisper.")
 
+# Maximum audio segments queued for continuous processing before new ones are refused
+MAX_AUDIO_QUEUE_SIZE = 16
+
+# Report dropped chunks on the first drop and then once per this many drops
+DROP_WARNING_INTERVAL = 10
+
+# Voice-activity gate: audio quieter than this RMS (full scale = 1.0) is not transcribed
+VAD_RMS_THRESHOLD = 0.005
+
+# Optional spectral gate: averaged spectra flatter than this can contain speech; pure
+# tones and hums fall well below it, but so can strongly voiced speech (a held vowel),
+# so the check only runs when WhisperSTT is created with spectral_gate=True
+VAD_FLATNESS_THRESHOLD = 1e-3
+
+# Frame size and maximum frame count for the gate's spectral flatness estimate
+VAD_FRAME_SIZE = 512
+VAD_MAX_FRAMES = 32
+
+# Converted CTranslate2 models are cached here as <model_size>-<compute_type>/
+CT2_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "koelingo", "ct2")
+
+# Sample rate expected by Whisper
+SAMPLE_RATE = 16000
+
+# Longest super-segment the continuous worker builds from queued chunks (Whisper's 30 s window)
+MAX_SUPER_SEGMENT_SAMPLES = 30 * SAMPLE_RATE
+
 # Make sure we're using the right package
 if not hasattr(whisper, 'load_model'):
     raise ImportError("OpenAI Whisper model not found. Please install with: pip install git+https://github.com/openai/whisper.git")
@@ -26,13 +56,28 @@ if not hasattr(whisper, 'load_model'):
 class WhisperSTT:
     """Speech-to-Text implementation using Whisper for Japanese recognition."""
 
+    # Parsed openai-whisper weights by "<model_size>:<device>", shared by every
+    # instance so loading a model that is already resident (or prefetched) skips
+    # reading the checkpoint. An entry is evicted when the last loaded instance
+    # using it is unloaded, or by clear_weight_cache().
+    _weight_cache: Dict[str, Tuple[Any, Dict[str, Any], Any]] = {}
+
+    # Number of loaded instances using each _weight_cache key, guarded by _weight_cache_lock
+    _weight_cache_users: Dict[str, int] = {}
+    _weight_cache_lock = threading.Lock()
+
+    # "<model_size>-<compute_type>" pairs whose CTranslate2 conversion failed in this
+    # process; later loads go straight to faster-whisper's download instead of retrying
+    _ct2_conversion_failed: Set[str] = set()
+
     def __init__(
         self,
         model_size: str = "tiny",
         device: str = "cpu",
-        compute_type: str = "float32",
+        compute_type: str = "int8",
         language: str = "ja",
         use_ctranslate2: bool = True,
+        spectral_gate: bool = False,
     ):
         """
         Initialize the Whisper speech recognition module.
@@ -40,27 +85,43 @@ class WhisperSTT:
         Args:
             model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
             device: Device to run inference on ('cpu' or 'cuda')
-            compute_type: Computation type ('float32', 'float16', or 'int8')
+            compute_type: Computation type ('float32', 'float16', or 'int8'); CTranslate2
+                models are quantized to this type once and cached on disk
             language: The language to recognize (default: 'ja' for Japanese)
             use_ctranslate2: Whether to use CTranslate2 optimized implementation if available
+            spectral_gate: Also reject tonal audio (hums, test tones) by spectral flatness
+                before inference; off by default because voiced-only utterances can fail it
         """
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
         self.language = language
         self.use_ctranslate2 = use_ctranslate2 and CTRANSLATE2_AVAILABLE
+        self.spectral_gate = spectral_gate
 
         # Flag to track if the model is loaded
         self.is_loaded = False
         self.model = None
         self.ct_model = None  # CTranslate2 model
+        self._weight_cache_key = None  # _weight_cache key this instance holds a use of
 
         # Threading resources
         self._processing_thread = None
         self._is_processing = False
         self._continuous_thread = None
         self._continuous_active = False
-        self._audio_queue = queue.Queue()
+        # Lock-free handoff from the audio thread to the continuous worker
+        self._audio_queue = SPSCAudioRing(
+            capacity_samples=MAX_SUPER_SEGMENT_SAMPLES, max_segments=MAX_AUDIO_QUEUE_SIZE
+        )
+        self._dropped_chunks = 0
+        # Wakes the continuous worker when audio is queued, instead of a sleep poll
+        self._audio_ready = threading.Event()
+        # Notified by the worker after each super-segment, for wait_until_idle()
+        self._drain_condition = threading.Condition()
+        # Reused by the continuous worker: queued chunks are drained back to back into
+        # this buffer so one model call covers all of them
+        self._batch_scratch = np.empty(MAX_SUPER_SEGMENT_SAMPLES, dtype=np.float32)
 
         # Callback for when transcription is ready
         self.transcription_callback = None
@@ -79,17 +140,20 @@ class WhisperSTT:
             print(f"Loading Whisper model: {self.model_size} (CTranslate2: {self.use_ctranslate2})")
             
             if self.use_ctranslate2:
-                # Use CTranslate2 implementation for better performance
+                # Use CTranslate2 implementation for better performance, loading the
+                # pre-quantized copy from the cache when one exists
+                model_path = self._cached_ct2_model()
                 self.ct_model = faster_whisper.WhisperModel(
-                    model_size_or_path=self.model_size,
+                    model_size_or_path=model_path or self.model_size,
                     device=self.device,
                     compute_type=self.compute_type,
+                    download_root=None if model_path else CT2_CACHE_DIR,
                 )
                 self.is_loaded = True
                 print("Whisper model loaded successfully with CTranslate2")
             else:
                 # Use standard Whisper implementation
-                self.model = whisper.load_model(self.model_size, device=self.device)
+                self.model = self._load_whisper_model()
                 self.is_loaded = True
                 print("Whisper model loaded successfully")
                 
@@ -99,11 +163,123 @@ class WhisperSTT:
             self.is_loaded = False
             return False
 
+    @classmethod
+    def prefetch_weights(cls, model_size: str = "tiny", device: str = "cpu") -> None:
+        """
+        Read and parse openai-whisper weights ahead of time.
+
+        Safe to run on a background thread, so the checkpoint read overlaps with
+        other work; a later load_model() for the same size and device then
+        takes the warm path. The weights stay cached until the last model using
+        them is unloaded or clear_weight_cache() is called.
+
+        Args:
+            model_size: Whisper model size to prefetch
+            device: Device the weights will be used on
+        """
+        key = f"{model_size}:{device}"
+        if key not in cls._weight_cache:
+            cls._cache_weights(key, whisper.load_model(model_size, device=device))
+
+    @classmethod
+    def clear_weight_cache(cls) -> None:
+        """Drop all cached openai-whisper weights so the next load reads the checkpoint."""
+        cls._weight_cache.clear()
+
+    @classmethod
+    def _cache_weights(cls, key: str, model: Any) -> None:
+        """Store the parts of a loaded model needed to rebuild it without the checkpoint."""
+        cls._weight_cache[key] = (model.dims, model.state_dict(), model.alignment_heads)
+
+    def _load_whisper_model(self) -> Any:
+        """
+        Load the openai-whisper model, reusing weights parsed earlier in this process.
+
+        Returns:
+            whisper.model.Whisper: The loaded model
+        """
+        key = f"{self.model_size}:{self.device}"
+        cached = WhisperSTT._weight_cache.get(key)
+        if cached is None:
+            model = whisper.load_model(self.model_size, device=self.device)
+            WhisperSTT._cache_weights(key, model)
+        else:
+            # Warm load: build the module and adopt the cached tensors without copying
+            # them (assign= needs torch >= 2.1; older versions copy into the module)
+            dims, state_dict, alignment_heads = cached
+            model = whisper.model.Whisper(dims)
+            try:
+                model.load_state_dict(state_dict, assign=True)
+            except TypeError:
+                model.load_state_dict(state_dict)
+            model.register_buffer("alignment_heads", alignment_heads, persistent=False)
+            model = model.to(self.device)
+
+        if self._weight_cache_key is None:
+            with WhisperSTT._weight_cache_lock:
+                WhisperSTT._weight_cache_users[key] = WhisperSTT._weight_cache_users.get(key, 0) + 1
+            self._weight_cache_key = key
+        return model
+
+    def _release_cached_weights(self) -> None:
+        """Drop this instance's use of the cached weights, evicting them if it was the last."""
+        key = self._weight_cache_key
+        if key is None:
+            return
+        self._weight_cache_key = None
+
+        with WhisperSTT._weight_cache_lock:
+            users = WhisperSTT._weight_cache_users.get(key, 0) - 1
+            if users > 0:
+                WhisperSTT._weight_cache_users[key] = users
+            else:
+                WhisperSTT._weight_cache_users.pop(key, None)
+                WhisperSTT._weight_cache.pop(key, None)
+
+    def _cached_ct2_model(self) -> Optional[str]:
+        """
+        Return the cached CTranslate2 model directory, converting it on first use.
+
+        The Hugging Face Whisper checkpoint is converted and quantized to
+        compute_type once; later loads skip the conversion entirely. A failed
+        conversion is remembered for the rest of the process and not retried.
+
+        Returns:
+            Optional[str]: Path to the converted model, or None if conversion is unavailable
+        """
+        name = f"{self.model_size}-{self.compute_type}"
+        model_dir = os.path.join(CT2_CACHE_DIR, name)
+        if os.path.isfile(os.path.join(model_dir, "model.bin")):
+            return model_dir
+        if name in WhisperSTT._ct2_conversion_failed:
+            return None
+
+        try:
+            print(f"Converting Whisper {self.model_size} to CTranslate2 ({self.compute_type})...")
+            converter = ctranslate2.converters.TransformersConverter(
+                f"openai/whisper-{self.model_size}",
+                copy_files=["tokenizer.json", "preprocessor_config.json"],
+            )
+            converter.convert(model_dir, quantization=self.compute_type, force=True)
+            return model_dir
+        except Exception as e:
+            # Any converter failure (transformers missing, offline, torch/safetensors
+            # load errors, unsupported quantization, ...) only disables the cache: fall
+            # back to faster-whisper's own download and don't retry in this process
+            print(f"CTranslate2 conversion unavailable, using downloaded model: {e}")
+            WhisperSTT._ct2_conversion_failed.add(name)
+            shutil.rmtree(model_dir, ignore_errors=True)
+            return None
+
     def unload_model(self) -> None:
         """Unload the model to free memory."""
         self.stop_continuous_processing()
         
         if self.model:
+            # Drop the cached weights too once no other loaded instance shares them,
+            # otherwise they stay resident
+            self._release_cached_weights()
+
             # In PyTorch-based models like Whisper, we can help free memory by
             # explicitly removing references and running garbage collection
             import gc
@@ -125,17 +301,50 @@ class WhisperSTT:
 
         self.is_loaded = False
 
+    def warmup(self) -> None:
+        """
+        Run one transcription on a short silent buffer to warm up the model.
+
+        The first inference pays one-off costs (lazy initialization, memory
+        allocation, cold caches); calling this ahead of time keeps them out of
+        the first real transcription. Blocks until the warm-up pass finishes.
+        """
+        if not self.is_loaded:
+            if not self.load_model():
+                return
+
+        silence = np.zeros(16000, dtype=np.float32)  # 1 second at 16kHz
+
+        try:
+            if self.use_ctranslate2 and self.ct_model:
+                segments, _ = self.ct_model.transcribe(
+                    silence,
+                    language=self.language,
+                    task="transcribe",
+                    beam_size=1
+                )
+                list(segments)  # Segments are generated lazily
+            else:
+                self.model.transcribe(silence, language=self.language, task="transcribe")
+        except Exception as e:
+            print(f"Error during model warm-up: {e}")
+
     def transcribe_audio(
         self,
         audio_data: np.ndarray,
-        callback: Optional[Callable[[str, float], None]] = None
+        callback: Optional[Callable[[str, float], None]] = None,
+        force: bool = False
     ) -> None:
         """
         Transcribe audio data asynchronously.
 
+        Silence is rejected by a cheap voice-activity gate and reported as
+        ("", 0.0) without running the model.
+
         Args:
             audio_data: Audio data as numpy array (16kHz, mono, float32)
             callback: Callback function to receive transcription results and confidence
+            force: Run the model even if the voice-activity gate rejects the audio
         """
         if callback:
             self.transcription_callback = callback
@@ -143,7 +352,65 @@ class WhisperSTT:
         # Start a new thread for processing to avoid blocking the UI
         self._processing_thread = threading.Thread(
             target=self._process_audio,
-            args=(audio_data,)
+            args=(audio_data, force)
+        )
+        self._processing_thread.daemon = True
+        self._processing_thread.start()
+
+    def transcribe_future(
+        self,
+        audio_data: np.ndarray,
+        force: bool = False
+    ) -> "Future[Tuple[str, float]]":
+        """
+        Transcribe audio data asynchronously and return a future.
+
+        Unlike transcribe_audio, errors are delivered through the future
+        instead of only being printed. Audio rejected by the voice-activity
+        gate resolves to ("", 0.0) without running the model.
+
+        Args:
+            audio_data: Audio data as numpy array (16kHz, mono, float32)
+            force: Run the model even if the voice-activity gate rejects the audio
+
+        Returns:
+            Future: Resolves to a (transcription, confidence) tuple
+        """
+        future: "Future[Tuple[str, float]]" = Future()
+
+        self._processing_thread = threading.Thread(
+            target=self._process_future,
+            args=(audio_data, future, force)
+        )
+        self._processing_thread.daemon = True
+        self._processing_thread.start()
+
+        return future
+
+    def transcribe_batch(
+        self,
+        audio_list: List[np.ndarray],
+        callback: Callable[[int, str, float], None],
+        force: bool = False
+    ) -> None:
+        """
+        Transcribe several audio buffers asynchronously.
+
+        All buffers are handled in order by a single worker thread using the
+        loaded model, so thread start-up and per-call setup are paid once for
+        the batch. Whisper's transcribe API takes one buffer at a time, so the
+        encoder still runs once per buffer. Buffers rejected by the
+        voice-activity gate report ("", 0.0) without running the model.
+
+        Args:
+            audio_list: Audio buffers as numpy arrays (16kHz, mono)
+            callback: Called as callback(index, text, confidence) as each
+                buffer completes; failed buffers report ("", 0.0)
+            force: Run the model even on buffers the voice-activity gate rejects
+        """
+        self._processing_thread = threading.Thread(
+            target=self._process_batch,
+            args=(list(audio_list), callback, force)
         )
         self._processing_thread.daemon = True
         self._processing_thread.start()
@@ -164,15 +431,17 @@ class WhisperSTT:
         if self._continuous_active:
             return True  # Already running
             
+        # The audio ring supports a single consumer; never start a second worker
+        # while a previous one is still finishing a transcription
+        if not self._join_continuous_thread():
+            print("Previous continuous processing thread is still running; not restarting")
+            return False
+            
         if callback:
             self.transcription_callback = callback
             
-        # Clear any existing audio queue
-        while not self._audio_queue.empty():
-            try:
-                self._audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Clear any existing audio queue (safe: no consumer thread is running)
+        self._audio_queue.clear()
                 
         self._continuous_active = True
         
@@ -188,23 +457,84 @@ class WhisperSTT:
     def stop_continuous_processing(self) -> None:
         """Stop continuous audio processing."""
         self._continuous_active = False
-        
+        self._audio_ready.set()  # Wake an idle worker so it sees the stop flag
+        self._join_continuous_thread()
+            
+    def _join_continuous_thread(self, timeout: float = 2.0) -> bool:
+        """
+        Wait for the continuous worker thread to exit.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            bool: True if no worker thread is running any more
+        """
         if self._continuous_thread and self._continuous_thread.is_alive():
             # Wait for thread to finish
-            self._continuous_thread.join(timeout=2.0)
+            self._continuous_thread.join(timeout=timeout)
+        return not (self._continuous_thread and self._continuous_thread.is_alive())
             
-    def process_audio_chunk(self, audio_chunk: np.ndarray) -> None:
+    def reset_state(self) -> None:
+        """
+        Stop continuous processing and discard queued audio.
+
+        The model stays loaded, so continuous processing can be restarted
+        without paying the load cost again. Queued audio is only discarded once
+        the worker has exited, since the ring's clear() is consumer-side.
+        """
+        self.stop_continuous_processing()
+        if self._join_continuous_thread():
+            self._audio_queue.clear()
+            self._is_processing = False
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the continuous worker has processed all queued audio.
+
+        Returns only after the last drained super-segment has been transcribed
+        and its callbacks have run, not merely once the queue has been popped.
+
+        Args:
+            timeout: Maximum time to wait in seconds, or None to wait indefinitely
+
+        Returns:
+            bool: True if the worker is idle with an empty queue, False if the
+            timeout expired first
+        """
+        with self._drain_condition:
+            return self._drain_condition.wait_for(
+                lambda: self._audio_queue.empty() and not self._is_processing, timeout
+            )
+
+    def process_audio_chunk(self, audio_chunk: np.ndarray) -> bool:
         """
         Process an audio chunk in continuous mode.
         
+        The queue is bounded; when the worker falls behind, new chunks are
+        refused instead of accumulating without limit.
+        
         Args:
             audio_chunk: Audio data chunk as numpy array
+            
+        Returns:
+            bool: True if queued, False if dropped because the queue is full or
+            the worker could not be started
         """
-        if not self._continuous_active:
-            self.start_continuous_processing()
+        if not self._continuous_active and not self.start_continuous_processing():
+            return False
+            
+        # Add to processing queue and wake the worker; is_set() is a plain read,
+        # so the Event's lock is only taken when the worker is actually waiting
+        if self._audio_queue.push(audio_chunk):
+            if not self._audio_ready.is_set():
+                self._audio_ready.set()
+            return True
             
-        # Add to processing queue
-        self._audio_queue.put(audio_chunk)
+        self._dropped_chunks += 1
+        if self._dropped_chunks % DROP_WARNING_INTERVAL == 1:
+            print(f"Warning: audio queue full, dropped {self._dropped_chunks} chunk(s) so far")
+        return False
         
     def _continuous_processing_loop(self) -> None:
         """Main loop for continuous audio processing."""
@@ -212,84 +542,93 @@ class WhisperSTT:
         
         while self._continuous_active:
             try:
-                # Get audio chunk from queue, with timeout
-                audio_chunk = self._audio_queue.get(timeout=0.5)
+                # Sleep until woken when idle. The queue is re-checked after
+                # clear(), so a wake-up is never lost.
+                if self._audio_queue.empty():
+                    self._audio_ready.wait(timeout=0.1)
+                    self._audio_ready.clear()
+                    continue
                 
-                # Process the chunk
+                # Mark busy before popping, so wait_until_idle() never sees an
+                # empty queue while a drained super-segment is still in flight
                 self._is_processing = True
                 
                 try:
-                    # Prepare audio data
-                    if audio_chunk.dtype != np.float32:
-                        if audio_chunk.dtype == np.int16:
-                            audio_chunk = audio_chunk.astype(np.float32) / 32768.0
-                        else:
-                            audio_chunk = audio_chunk.astype(np.float32)
-                            max_value = max(np.max(np.abs(audio_chunk)), 1e-10)
-                            audio_chunk /= max_value
+                    # Drain queued chunks into one super-segment
+                    audio, cu_seqlens = self._drain_super_segment()
+                    if not self._should_transcribe(audio):
+                        continue
+                    segments, confidence = self._transcribe_segments(audio)
                     
-                    # Set options for Japanese recognition
-                    if self.use_ctranslate2 and self.ct_model:
-                        # Process with CTranslate2 
-                        segments, info = self.ct_model.transcribe(
-                            audio_chunk,
-                            language=self.language,
-                            task="transcribe",
-                            beam_size=5
-                        )
-                        
-                        # Extract text from segments
-                        transcription = ""
-                        segment_list = list(segments)  # Convert generator to list
-                        for segment in segment_list:
-                            transcription += segment.text
-                        
-                        # Estimate confidence
-                        if segment_list:
-                            avg_prob = sum(s.avg_logprob for s in segment_list) / len(segment_list)
-                            # Convert log probability to confidence score (0-1)
-                            confidence = min(1.0, max(0.0, 1.0 + avg_prob/10))
-                        else:
-                            confidence = 0.7  # Default confidence
-                    else:
-                        # Process with standard Whisper
-                        options = {
-                            "language": self.language,
-                            "task": "transcribe"
-                        }
-                        
-                        result = self.model.transcribe(audio_chunk, **options)
-                        transcription = result["text"].strip()
-                        confidence = self._estimate_confidence(result)
+                    # Route each segment back to the chunk it started in, so the
+                    # callback still receives one transcription per queued chunk
+                    chunk_texts = [""] * len(cu_seqlens)
+                    if segments:
+                        start_samples = np.array([start for start, _ in segments]) * SAMPLE_RATE
+                        owners = np.searchsorted(cu_seqlens, start_samples, side="right")
+                        np.minimum(owners, len(cu_seqlens) - 1, out=owners)
+                        for owner, (_, text) in zip(owners, segments):
+                            chunk_texts[owner] += text
                     
-                    if transcription:
-                        # Call the callback with the transcription result
-                        if self.transcription_callback:
-                            self.transcription_callback(transcription, confidence)
+                    for text in chunk_texts:
+                        transcription = text.strip()
+                        if transcription:
+                            # Call the callback with the transcription result
+                            if self.transcription_callback:
+                                self.transcription_callback(transcription, confidence)
                             
                 except Exception as e:
                     print(f"Error processing audio chunk: {e}")
                 
                 finally:
                     self._is_processing = False
-                    self._audio_queue.task_done()
+                    with self._drain_condition:
+                        self._drain_condition.notify_all()
                     
-            except queue.Empty:
-                # No data in queue, just continue
-                pass
-                
             except Exception as e:
                 print(f"Error in continuous processing loop: {e}")
                 
         print("Continuous processing loop stopped")
 
-    def _process_audio(self, audio_data: np.ndarray) -> None:
+    def _drain_super_segment(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Pop queued chunks back to back into the batch scratch buffer.
+
+        Draining stops when the queue is empty or the next chunk would not fit
+        in MAX_SUPER_SEGMENT_SAMPLES.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: The concatenated float32 audio
+            (a view of the scratch buffer) and the cumulative end sample of each
+            chunk, or None if the queue is empty
+        """
+        lengths = []
+        total = 0
+        while True:
+            n = self._audio_queue.peek_size()
+            if n is None or (lengths and total + n > MAX_SUPER_SEGMENT_SAMPLES):
+                break
+            self._audio_queue.pop(out=self._batch_scratch[total:])
+            lengths.append(n)
+            total += n
+        
+        if not lengths:
+            return None
+        return self._batch_scratch[:total], np.cumsum(lengths)
+
+    def _process_audio(self, audio_data: np.ndarray, force: bool = False) -> None:
         """
         Process audio data in a background thread.
 
         Args:
             audio_data: Audio data as numpy array (16kHz, mono, float32)
+            force: Skip the voice-activity gate
         """
+        if not force and not self._should_transcribe(audio_data):
+            if self.transcription_callback:
+                self.transcription_callback("", 0.0)
+            return
+
         if not self.is_loaded:
             if not self.load_model():
                 return
@@ -297,56 +636,9 @@ class WhisperSTT:
         self._is_processing = True
 
         try:
-            # Normalize audio if needed (ensuring range is between -1 and 1)
-            if audio_data.dtype != np.float32:
-                if audio_data.dtype == np.int16:
-                    # Convert 16-bit PCM to float32 in range [-1, 1]
-                    audio_data = audio_data.astype(np.float32) / 32768.0
-                else:
-                    # Generic normalization for other types
-                    audio_data = audio_data.astype(np.float32)
-                    max_value = max(np.max(np.abs(audio_data)), 1e-10)
-                    audio_data /= max_value
-
             # Perform transcription
             start_time = time.time()
-
-            # Process with the appropriate model
-            if self.use_ctranslate2 and self.ct_model:
-                # Set options for Japanese recognition with CTranslate2
-                segments, info = self.ct_model.transcribe(
-                    audio_data,
-                    language=self.language,
-                    task="transcribe",
-                    beam_size=5
-                )
-                
-                # Extract text from segments
-                transcription = ""
-                segment_list = list(segments)  # Convert generator to list
-                for segment in segment_list:
-                    transcription += segment.text
-                
-                # Estimate confidence
-                if segment_list:
-                    avg_prob = sum(s.avg_logprob for s in segment_list) / len(segment_list)
-                    # Convert log probability to confidence score (0-1)
-                    confidence = min(1.0, max(0.0, 1.0 + avg_prob/10))
-                else:
-                    confidence = 0.7  # Default confidence
-            else:
-                # Set options for Japanese recognition with standard Whisper
-                options = {
-                    "language": self.language,
-                    "task": "transcribe"
-                }
-
-                # Transcribe audio
-                result = self.model.transcribe(audio_data, **options)
-
-                # Extract text and compute a confidence score
-                transcription = result["text"].strip()
-                confidence = self._estimate_confidence(result)
+            transcription, confidence = self._transcribe_array(audio_data)
 
             end_time = time.time()
             processing_time = end_time - start_time
@@ -361,6 +653,196 @@ class WhisperSTT:
         finally:
             self._is_processing = False
 
+    def _process_future(self, audio_data: np.ndarray, future: Future, force: bool = False) -> None:
+        """
+        Process audio data in a background thread and resolve a future.
+
+        Args:
+            audio_data: Audio data as numpy array (16kHz, mono)
+            future: Future to receive the (transcription, confidence) result
+            force: Skip the voice-activity gate
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+
+        if not force and not self._should_transcribe(audio_data):
+            future.set_result(("", 0.0))
+            return
+
+        self._is_processing = True
+
+        try:
+            if not self.is_loaded and not self.load_model():
+                raise RuntimeError("Failed to load Whisper model")
+            future.set_result(self._transcribe_array(audio_data))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._is_processing = False
+
+    def _process_batch(
+        self,
+        audio_list: List[np.ndarray],
+        callback: Callable[[int, str, float], None],
+        force: bool = False
+    ) -> None:
+        """
+        Process several audio buffers in order in a background thread.
+
+        Every index receives exactly one callback; items that fail (or a batch
+        whose model cannot be loaded) are reported as ("", 0.0).
+
+        Args:
+            audio_list: Audio buffers (16kHz, mono)
+            callback: Called as callback(index, text, confidence) per buffer
+            force: Skip the voice-activity gate
+        """
+        if not self.is_loaded:
+            if not self.load_model():
+                print("Error during batch transcription: failed to load Whisper model")
+                for index in range(len(audio_list)):
+                    callback(index, "", 0.0)
+                return
+
+        self._is_processing = True
+
+        try:
+            start_time = time.time()
+            for index, audio_data in enumerate(audio_list):
+                if not force and not self._should_transcribe(audio_data):
+                    callback(index, "", 0.0)
+                    continue
+                try:
+                    transcription, confidence = self._transcribe_array(audio_data)
+                except Exception as e:
+                    print(f"Error during transcription of batch item {index}: {e}")
+                    transcription, confidence = "", 0.0
+                callback(index, transcription, confidence)
+
+            processing_time = time.time() - start_time
+            print(f"Batch of {len(audio_list)} processed in {processing_time:.2f} seconds")
+        finally:
+            self._is_processing = False
+
+    def _should_transcribe(self, audio_data: np.ndarray) -> bool:
+        """
+        Cheap voice-activity gate run before Whisper inference.
+
+        Rejects audio whose RMS is below VAD_RMS_THRESHOLD. With spectral_gate
+        enabled, also rejects audio whose averaged short-time spectrum has a
+        flatness below VAD_FLATNESS_THRESHOLD (pure tones and hums).
+
+        Args:
+            audio_data: Audio data as numpy array (16kHz, mono)
+
+        Returns:
+            bool: True if the audio may contain speech and should be transcribed
+        """
+        n = len(audio_data)
+        if n == 0:
+            return False
+
+        if audio_data.dtype == np.int16:
+            samples = np.multiply(audio_data, np.float32(1.0 / 32768.0))
+        else:
+            samples = audio_data.astype(np.float32, copy=False)
+
+        rms = np.sqrt(np.dot(samples, samples) / n)
+        if rms < VAD_RMS_THRESHOLD:
+            return False
+        if not self.spectral_gate or n < VAD_FRAME_SIZE:
+            return True
+
+        # Average the power spectrum of frames spread across the buffer
+        n_frames = min(VAD_MAX_FRAMES, n // VAD_FRAME_SIZE)
+        starts = np.linspace(0, n - VAD_FRAME_SIZE, n_frames).astype(np.intp)
+        frames = samples[starts[:, None] + np.arange(VAD_FRAME_SIZE)]
+        frames *= np.hanning(VAD_FRAME_SIZE).astype(np.float32)
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        power = power.mean(axis=0)
+        # Floor relative to the spectrum so an empty upper band (e.g. 8 kHz audio
+        # resampled to 16 kHz) doesn't drag the geometric mean towards zero
+        np.maximum(power, power.max() * 1e-6 + 1e-20, out=power)
+
+        # Spectral flatness: geometric mean over arithmetic mean of the power spectrum
+        flatness = np.exp(np.mean(np.log(power))) / np.mean(power)
+        return bool(flatness >= VAD_FLATNESS_THRESHOLD)
+
+    def _transcribe_array(self, audio_data: np.ndarray) -> Tuple[str, float]:
+        """
+        Transcribe a single audio buffer with the loaded model.
+
+        Args:
+            audio_data: Audio data as numpy array (16kHz, mono)
+
+        Returns:
+            Tuple[str, float]: Transcription text and estimated confidence
+        """
+        segments, confidence = self._transcribe_segments(audio_data)
+        transcription = "".join(text for _, text in segments).strip()
+        return transcription, confidence
+
+    def _transcribe_segments(self, audio_data: np.ndarray) -> Tuple[List[Tuple[float, str]], float]:
+        """
+        Transcribe an audio buffer and keep the per-segment timings.
+
+        Args:
+            audio_data: Audio data as numpy array (16kHz, mono)
+
+        Returns:
+            Tuple[List[Tuple[float, str]], float]: (start time in seconds, text) for
+            each segment, and the estimated confidence
+        """
+        # Normalize audio if needed (ensuring range is between -1 and 1)
+        if audio_data.dtype != np.float32:
+            if audio_data.dtype == np.int16:
+                # Convert 16-bit PCM to float32 in range [-1, 1] in a single pass
+                audio_data = np.multiply(audio_data, np.float32(1.0 / 32768.0))
+            else:
+                # Generic normalization for other types
+                audio_data = audio_data.astype(np.float32)
+                max_value = max(np.max(np.abs(audio_data)), 1e-10)
+                audio_data /= max_value
+
+        # Process with the appropriate model
+        if self.use_ctranslate2 and self.ct_model:
+            # Set options for Japanese recognition with CTranslate2
+            segments, info = self.ct_model.transcribe(
+                audio_data,
+                language=self.language,
+                task="transcribe",
+                beam_size=5
+            )
+
+            # Extract timed text from segments
+            segment_list = list(segments)  # Convert generator to list
+            timed_segments = [(segment.start, segment.text) for segment in segment_list]
+
+            # Estimate confidence
+            if segment_list:
+                avg_prob = sum(s.avg_logprob for s in segment_list) / len(segment_list)
+                # Convert log probability to confidence score (0-1)
+                confidence = min(1.0, max(0.0, 1.0 + avg_prob/10))
+            else:
+                confidence = 0.7  # Default confidence
+        else:
+            # Set options for Japanese recognition with standard Whisper
+            options = {
+                "language": self.language,
+                "task": "transcribe"
+            }
+
+            # Transcribe audio
+            result = self.model.transcribe(audio_data, **options)
+
+            # Extract timed text and compute a confidence score
+            timed_segments = [
+                (segment["start"], segment["text"]) for segment in result.get("segments", [])
+            ]
+            confidence = self._estimate_confidence(result)
+
+        return timed_segments, confidence
+
     def _estimate_confidence(self, result: Dict[str, Any]) -> float:
         """
         Estimate confidence score from Whisper result.
@@ -375,18 +857,18 @@ class WhisperSTT:
         """
         # Extract segments if available
         if "segments" in result and result["segments"]:
-            # Compute average segment-level confidence (no_speech_prob inverse)
-            total_conf = 0.0
-            for segment in result["segments"]:
-                # Lower no_speech_prob means higher confidence that this is speech
-                if "no_speech_prob" in segment:
-                    total_conf += (1.0 - segment["no_speech_prob"])
-                else:
-                    # If no_speech_prob not available, use a moderate default
-                    total_conf += 0.7
+            # Compute average segment-level confidence (no_speech_prob inverse).
+            # Lower no_speech_prob means higher confidence that this is speech; if it
+            # is not available, 0.3 gives a moderate default confidence of 0.7.
+            segments = result["segments"]
+            no_speech_probs = np.fromiter(
+                (segment.get("no_speech_prob", 0.3) for segment in segments),
+                dtype=np.float64,
+                count=len(segments),
+            )
 
             # Average confidence across segments
-            confidence = total_conf / len(result["segments"])
+            confidence = float(1.0 - no_speech_probs.mean())
 
             # Apply some model size scaling (larger models generally perform better)
             model_quality_factor = {
@@ -7,6 +7,7 @@ import os
 import tempfile
 import sys
 import time
+import numpy as np
 
 # Import the AudioCapture class
 from src.audio import AudioCapture
@@ -103,6 +104,19 @@ class AudioCaptureTest(unittest.TestCase):
         time.sleep(0.3)
         print(f"AudioCaptureTest.Cleanup ({int(0.3 * 1000)} ms)")
 
+    def test_AudioLevel(self):
+        """Test RMS audio level calculation."""
+        self.assertEqual(self.audio._calculate_audio_level(np.zeros(0, dtype=np.int16)), 0.0)
+        self.assertEqual(self.audio._calculate_audio_level(np.zeros(1024, dtype=np.int16)), 0.0)
+
+        # A constant half-scale signal has an RMS of 0.5
+        half = np.full(1024, 16384, dtype=np.int16)
+        self.assertAlmostEqual(self.audio._calculate_audio_level(half), 0.5, places=5)
+
+        # Full-scale square wave saturates at 1.0
+        square = np.tile(np.array([32767, -32768], dtype=np.int16), 512)
+        self.assertAlmostEqual(self.audio._calculate_audio_level(square), 1.0, places=4)
+
     def test_AudioQueue(self):
         """Test audio queue functionality."""
         # Start recording
@@ -3,60 +3,131 @@ Tests for continuous audio processing functionality.
 """
 
 import unittest
+import importlib.util
 import os
 import tempfile
 import time
 import threading
 import numpy as np
 from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
+from queue import Queue, SimpleQueue, Empty
 
 # Import the necessary classes
 from src.audio import AudioCapture
 
 
 class MockAudioCallback:
-    """Mock callback class for testing audio processing."""
+    """Mock callback class for testing audio processing.
+    
+    The callbacks run on the audio thread, so they only push onto lock-free
+    SimpleQueues; the test thread drains them into lists when it reads.
+    """
     
     def __init__(self):
         self.levels = []
         self.chunks = []
-        self.lock = threading.Lock()
+        self.lock = threading.Lock()  # Guards the drained lists (reader side)
+        self._level_q = SimpleQueue()
+        self._chunk_q = SimpleQueue()
+        self._level_count = 0
+        self._chunk_count = 0
+        # Signalled once the received data reaches the requested count
+        self._levels_ready = threading.Event()
+        self._chunks_ready = threading.Event()
+        self._levels_target = 0
+        self._chunks_target = 0
         
     def level_callback(self, level):
         """Store the audio level."""
-        with self.lock:
-            self.levels.append(level)
+        self._level_q.put_nowait(level)
+        self._level_count += 1
+        if self._level_count >= self._levels_target:
+            self._levels_ready.set()
     
     def chunk_callback(self, chunk):
         """Store the audio chunk."""
-        with self.lock:
-            self.chunks.append(chunk)
+        self._chunk_q.put_nowait(chunk)
+        self._chunk_count += 1
+        if self._chunk_count >= self._chunks_target:
+            self._chunks_ready.set()
+            
+    @staticmethod
+    def _drain(q, out):
+        """Move everything currently in `q` onto the list `out`."""
+        try:
+            while True:
+                out.append(q.get_nowait())
+        except Empty:
+            pass
+            
+    def wait_for_levels(self, count, timeout):
+        """
+        Wait until at least `count` levels have been received.
+        
+        Returns:
+            bool: True if the count was reached before the timeout
+        """
+        self._levels_target = count
+        self._levels_ready.clear()
+        if self._level_count >= count:
+            return True
+        return self._levels_ready.wait(timeout=timeout)
+        
+    def wait_for_chunks(self, count, timeout):
+        """
+        Wait until at least `count` chunks have been received.
+        
+        Returns:
+            bool: True if the count was reached before the timeout
+        """
+        self._chunks_target = count
+        self._chunks_ready.clear()
+        if self._chunk_count >= count:
+            return True
+        return self._chunks_ready.wait(timeout=timeout)
             
     def get_levels(self):
         """Get current levels."""
         with self.lock:
+            self._drain(self._level_q, self.levels)
             return self.levels.copy()
             
     def get_chunks(self):
         """Get current chunks."""
         with self.lock:
+            self._drain(self._chunk_q, self.chunks)
             return self.chunks.copy()
             
     def clear(self):
         """Clear stored data."""
         with self.lock:
+            self._drain(self._level_q, [])
+            self._drain(self._chunk_q, [])
             self.levels = []
             self.chunks = []
+            self._level_count = 0
+            self._chunk_count = 0
 
 
 class ContinuousProcessingTest(unittest.TestCase):
     """Test cases for continuous audio processing."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared fixtures (device enumeration, PortAudio init) once."""
+        cls.audio = AudioCapture()
+        cls.callback = MockAudioCallback()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down shared fixtures."""
+        cls.audio.stop_recording()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.audio = AudioCapture()
-        self.callback = MockAudioCallback()
+        self.audio.stop_recording()
+        self.audio.buffered_chunks_for_processing = []
+        self.callback.clear()
         print("Running continuous audio processing tests...")
 
     def tearDown(self):
@@ -75,8 +146,8 @@ class ContinuousProcessingTest(unittest.TestCase):
         self.assertTrue(self.audio.is_recording)
         self.assertTrue(self.audio.continuous_mode)
         
-        # Let it record for a short time
-        time.sleep(2.0)
+        # Wait until enough level updates arrive (bounded by 2 seconds)
+        self.callback.wait_for_levels(20, timeout=2.0)
         
         # Verify we received audio levels
         levels = self.callback.get_levels()
@@ -104,8 +175,8 @@ class ContinuousProcessingTest(unittest.TestCase):
         )
         self.assertTrue(success)
         
-        # Record for enough time to potentially detect silence
-        time.sleep(4.0)
+        # Wait for a speech segment, or long enough to potentially detect silence
+        self.callback.wait_for_chunks(1, timeout=4.0)
         
         # Get chunks that were processed
         chunks = self.callback.get_chunks()
@@ -127,7 +198,10 @@ class ContinuousProcessingTest(unittest.TestCase):
     
     def test_SpeechBuffering(self):
         """Test speech segment buffering."""
-        # Configure for testing
+        # Configure for testing (restored afterwards, the capture is shared)
+        self.addCleanup(setattr, self.audio, "min_speech_chunks", self.audio.min_speech_chunks)
+        self.addCleanup(setattr, self.audio, "chunk_processing_callback",
+                        self.audio.chunk_processing_callback)
         self.audio.min_speech_chunks = 5
         
         # Create a buffer of "simulated speech"
@@ -158,8 +232,11 @@ class ContinuousProcessingTest(unittest.TestCase):
         self.assertEqual(self.audio.current_silence_count, 0,
                          "Silence count should be reset")
     
+    @unittest.skipUnless(importlib.util.find_spec("psutil"), "psutil not installed")
     def test_ExtendedOperation(self):
         """Test extended operation for stability."""
+        import psutil
+
         test_duration = 10.0  # Run for 10 seconds
         
         # Start recording with continuous mode
@@ -173,56 +250,50 @@ class ContinuousProcessingTest(unittest.TestCase):
         start_time = time.time()
         check_interval = 1.0  # Check every second
         
-        # Track metrics
-        metrics = {
-            "cpu_usage": [],
-            "memory_usage": [],
-            "buffer_size": [],
-            "callbacks": []
-        }
+        # Track metrics in preallocated arrays (one slot per check interval)
+        n_samples = int(test_duration / check_interval) + 1
+        cpu_usage = np.empty(n_samples, dtype=np.float32)
+        memory_usage = np.empty(n_samples, dtype=np.float32)
+        buffer_size = np.empty(n_samples, dtype=np.int32)
+        callbacks = np.empty(n_samples, dtype=np.int32)
+        n = 0
         
-        try:
-            # Monitor resource usage during the test
-            import psutil
-            process = psutil.Process(os.getpid())
-            
-            while time.time() - start_time < test_duration:
-                # Record metrics
-                metrics["cpu_usage"].append(process.cpu_percent())
-                metrics["memory_usage"].append(process.memory_info().rss / 1024 / 1024)  # MB
-                metrics["buffer_size"].append(len(self.audio.audio_buffer))
-                metrics["callbacks"].append(len(self.callback.get_levels()))
-                
-                # Sleep for the check interval
-                time.sleep(check_interval)
-                
-            # Stop recording
-            self.audio.stop_recording()
-            
-            # Calculate average metrics
-            avg_cpu = sum(metrics["cpu_usage"]) / len(metrics["cpu_usage"]) if metrics["cpu_usage"] else 0
-            avg_memory = sum(metrics["memory_usage"]) / len(metrics["memory_usage"]) if metrics["memory_usage"] else 0
-            max_buffer = max(metrics["buffer_size"]) if metrics["buffer_size"] else 0
-            callback_growth = metrics["callbacks"][-1] - metrics["callbacks"][0] if len(metrics["callbacks"]) > 1 else 0
-            
-            # Print metrics
-            print(f"Extended operation metrics:")
-            print(f"  - Average CPU: {avg_cpu:.2f}%")
-            print(f"  - Average Memory: {avg_memory:.2f} MB")
-            print(f"  - Max Buffer Size: {max_buffer} chunks")
-            print(f"  - Callback Growth: {callback_growth} callbacks")
+        # Monitor resource usage during the test
+        process = psutil.Process(os.getpid())
+        
+        while time.time() - start_time < test_duration and n < n_samples:
+            # Record metrics; oneshot() shares one /proc snapshot between both reads
+            with process.oneshot():
+                cpu_usage[n] = process.cpu_percent()
+                memory_usage[n] = process.memory_info().rss / 1024 / 1024  # MB
+            buffer_size[n] = len(self.audio.audio_buffer)
+            callbacks[n] = len(self.callback.get_levels())
+            n += 1
             
-            # Verify metrics
-            # These are just basic checks - adjust thresholds as needed
-            self.assertLess(avg_cpu, 80.0, "CPU usage too high during extended operation")
-            self.assertLess(max_buffer, self.audio.max_buffer_size * 1.1, 
-                           "Buffer size exceeded limits during extended operation")
+            # Sleep for the check interval
+            time.sleep(check_interval)
             
-        except ImportError:
-            # If psutil isn't available, just run the test without metrics
-            time.sleep(test_duration)
-            self.audio.stop_recording()
-            print("Note: Install psutil for detailed performance metrics")
+        # Stop recording
+        self.audio.stop_recording()
+        
+        # Calculate average metrics
+        avg_cpu = float(cpu_usage[:n].mean()) if n else 0
+        avg_memory = float(memory_usage[:n].mean()) if n else 0
+        max_buffer = int(buffer_size[:n].max()) if n else 0
+        callback_growth = int(callbacks[n - 1] - callbacks[0]) if n > 1 else 0
+        
+        # Print metrics
+        print(f"Extended operation metrics:")
+        print(f"  - Average CPU: {avg_cpu:.2f}%")
+        print(f"  - Average Memory: {avg_memory:.2f} MB")
+        print(f"  - Max Buffer Size: {max_buffer} chunks")
+        print(f"  - Callback Growth: {callback_growth} callbacks")
+        
+        # Verify metrics
+        # These are just basic checks - adjust thresholds as needed
+        self.assertLess(avg_cpu, 80.0, "CPU usage too high during extended operation")
+        self.assertLess(max_buffer, self.audio.max_buffer_size * 1.1, 
+                       "Buffer size exceeded limits during extended operation")
 
 
 if __name__ == "__main__":
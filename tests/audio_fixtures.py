@@ -0,0 +1,47 @@
+"""
+Shared synthetic audio helpers for the test suite.
+"""
+
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=16)
+def sample_times(duration, sr=16000):
+    """
+    Return read-only float32 sample times for a clip, cached per (duration, sr).
+
+    Args:
+        duration: Length in seconds
+        sr: Sample rate in Hz
+
+    Returns:
+        np.ndarray: Sample times in seconds; callers must not modify it
+    """
+    t = np.linspace(0, duration, int(sr * duration), endpoint=False, dtype=np.float32)
+    t.flags.writeable = False
+    return t
+
+
+@functools.lru_cache(maxsize=None)
+def make_tone(freq, duration, sr=16000):
+    """
+    Build a read-only int16 sine tone, cached per (freq, duration, sr).
+
+    Args:
+        freq: Tone frequency in Hz
+        duration: Length in seconds
+        sr: Sample rate in Hz
+
+    Returns:
+        np.ndarray: int16 samples
+    """
+    n = int(sr * duration)
+    # One float32 scratch for phase -> sine -> scale, then a single int16 write
+    scratch = np.arange(n, dtype=np.float32)
+    scratch *= np.float32(2 * np.pi * freq / sr)
+    np.sin(scratch, out=scratch)
+    tone = np.empty(n, dtype=np.int16)
+    np.multiply(scratch, np.float32(32767), out=tone, casting="unsafe")
+    tone.flags.writeable = False
+    return tone
@@ -25,14 +25,22 @@ class CustomTestResult(unittest.TestResult):
         self.suite_test_count = 0
         self.total_tests_run = 0
         self.test_times = {}  # Store test execution times
+        self._current_test = None
+        self._current_qual = None  # "Suite.test_name" of the running test
+        self._out = sys.stdout  # Cached once; every line is a single write
+
+    def _emit(self, line):
+        """Write one preformatted line to the output stream."""
+        self._out.write(line + "\n")
 
     def startTestRun(self):
         """Called when the test run starts."""
         super().startTestRun()
         self.total_start_time = time.time()
-        print("Preparing to run tests...")
-        print("Required tests already built. Skipping build step.")
-        print("Running tests...")
+        if self.verbose > 0:
+            self._emit("Preparing to run tests...")
+            self._emit("Required tests already built. Skipping build step.")
+            self._emit("Running tests...")
 
     def startTest(self, test):
         """Called when a test starts."""
@@ -41,92 +49,106 @@ class CustomTestResult(unittest.TestResult):
         # For verbose mode, print test docstring
         if self.verbose > 1:
             docstring = test._testMethodDoc or "No test docstring"
-            print(f"{test.id()} ({docstring})")
+            self._emit(f"{test.id()} ({docstring})")
 
         suite_name = type(test).__name__
 
         # If this is a new test suite, print suite information
         if self.current_suite != suite_name:
-            if self.current_suite is not None:
+            if self.current_suite is not None and self.verbose > 0:
                 suite_time = time.time() - self.suite_start_time
-                print(f"{colored('[----------]', 'green')} {self.suite_test_count} tests from {self.current_suite} ({int(suite_time * 1000)} ms total)")
-                print("")
+                self._emit(f"{colored('[----------]', 'green')} {self.suite_test_count} tests from {self.current_suite} ({int(suite_time * 1000)} ms total)")
+                self._emit("")
 
             self.current_suite = suite_name
             self.suite_start_time = time.time()
             self.suites_run += 1
             self.suite_test_count = 0
 
-            # Count tests in this suite
-            count = 0
-            for method_name in dir(test):
-                if method_name.startswith('test'):
-                    count += 1
+            if self.verbose > 0:
+                # Count tests in this suite
+                count = 0
+                for method_name in dir(test):
+                    if method_name.startswith('test'):
+                        count += 1
 
-            print(f"{colored('[==========]', 'green')} Running {count} tests from {suite_name}.")
-            print(f"{colored('[----------]', 'green')} Global test environment set-up.")
-            print(f"{colored('[----------]', 'green')} {count} tests from {suite_name}")
+                self._emit(f"{colored('[==========]', 'green')} Running {count} tests from {suite_name}.")
+                self._emit(f"{colored('[----------]', 'green')} Global test environment set-up.")
+                self._emit(f"{colored('[----------]', 'green')} {count} tests from {suite_name}")
 
         # Print test start information
-        test_name = test._testMethodName
-        print(f"{colored('[ RUN      ]', 'green')} {suite_name}.{test_name}")
+        self._current_test = test
+        self._current_qual = f"{suite_name}.{test._testMethodName}"
+        if self.verbose > 0:
+            self._emit(f"{colored('[ RUN      ]', 'green')} {self._current_qual}")
         self.test_start_time = time.time()
         self.suite_test_count += 1
         self.total_tests_run += 1
 
+    def _record_time(self, test):
+        """Store the elapsed time of the current test and return it in ms."""
+        if self.test_start_time is None:
+            return 0
+        test_time = time.time() - self.test_start_time
+        self.test_times[test.id()] = test_time
+        return int(test_time * 1000)
+
+    def _label(self, test):
+        """Return the display name of a test, reusing the cached one when possible."""
+        if test is self._current_test:
+            return self._current_qual
+        # Class/module fixture errors arrive as placeholders that never started
+        return test.id()
+
     def addSuccess(self, test):
         """Called when a test succeeds."""
         super().addSuccess(test)
-        test_time = time.time() - self.test_start_time
-        self.test_times[test.id()] = test_time
+        ms = self._record_time(test)
         # For verbose mode, print a simple "ok"
         if self.verbose > 1:
-            print("ok")
-        msg = f"{colored('[       OK ]', 'green')} {type(test).__name__}.{test._testMethodName} ({int(test_time * 1000)} ms)"
-        print(msg)
+            self._emit("ok")
+        if self.verbose > 0:
+            self._emit(f"{colored('[       OK ]', 'green')} {self._label(test)} ({ms} ms)")
 
     def addError(self, test, err):
         """Called when a test raises an unexpected exception."""
         super().addError(test, err)
-        test_time = time.time() - self.test_start_time
-        self.test_times[test.id()] = test_time
+        ms = self._record_time(test)
         if self.verbose > 1:
-            print("ERROR")
-        msg = f"{colored('[     ERROR]', 'red')} {type(test).__name__}.{test._testMethodName} ({int(test_time * 1000)} ms)"
-        print(msg)
+            self._emit("ERROR")
+        if self.verbose > 0:
+            self._emit(f"{colored('[     ERROR]', 'red')} {self._label(test)} ({ms} ms)")
 
     def addFailure(self, test, err):
         """Called when a test fails."""
         super().addFailure(test, err)
-        test_time = time.time() - self.test_start_time
-        self.test_times[test.id()] = test_time
+        ms = self._record_time(test)
         if self.verbose > 1:
-            print("FAIL")
-        msg = f"{colored('[   FAILED ]', 'red')} {type(test).__name__}.{test._testMethodName} ({int(test_time * 1000)} ms)"
-        print(msg)
+            self._emit("FAIL")
+        if self.verbose > 0:
+            self._emit(f"{colored('[   FAILED ]', 'red')} {self._label(test)} ({ms} ms)")
 
     def addSkip(self, test, reason):
         """Called when a test is skipped."""
         super().addSkip(test, reason)
-        test_time = time.time() - self.test_start_time
-        self.test_times[test.id()] = test_time
+        ms = self._record_time(test)
         if self.verbose > 1:
-            print(f"skipped {reason!r}")
-        msg = f"{colored('[  SKIPPED ]', 'yellow')} {type(test).__name__}.{test._testMethodName} ({int(test_time * 1000)} ms) {reason}"
-        print(msg)
+            self._emit(f"skipped {reason!r}")
+        if self.verbose > 0:
+            self._emit(f"{colored('[  SKIPPED ]', 'yellow')} {self._label(test)} ({ms} ms) {reason}")
 
     def stopTestRun(self):
         """Called when the test run completes."""
         super().stopTestRun()
 
-        if self.current_suite is not None:
+        if self.current_suite is not None and self.verbose > 0:
             suite_time = time.time() - self.suite_start_time
-            print(f"{colored('[----------]', 'green')} {self.suite_test_count} tests from {self.current_suite} ({int(suite_time * 1000)} ms total)")
-            print("")
+            self._emit(f"{colored('[----------]', 'green')} {self.suite_test_count} tests from {self.current_suite} ({int(suite_time * 1000)} ms total)")
+            self._emit("")
 
         total_time = time.time() - self.total_start_time
-        print(f"{colored('[----------]', 'green')} Global test environment tear-down")
-        print(f"{colored('[==========]', 'green')} {self.total_tests_run} tests from {self.suites_run} test suite ran. ({int(total_time * 1000)} ms total)")
+        self._emit(f"{colored('[----------]', 'green')} Global test environment tear-down")
+        self._emit(f"{colored('[==========]', 'green')} {self.total_tests_run} tests from {self.suites_run} test suite ran. ({int(total_time * 1000)} ms total)")
 
         if self.failures or self.errors:
             result_color = 'red'
@@ -135,32 +157,32 @@ class CustomTestResult(unittest.TestResult):
             result_color = 'green'
             result_text = 'PASSED'
 
-        print(f"{colored(f'[ {result_text}  ]', result_color)} {self.total_tests_run} tests.")
+        self._emit(f"{colored(f'[ {result_text}  ]', result_color)} {self.total_tests_run} tests.")
 
         if self.failures:
-            print(f"{colored('[  FAILED  ]', 'red')} {len(self.failures)} tests, listed below:")
+            self._emit(f"{colored('[  FAILED  ]', 'red')} {len(self.failures)} tests, listed below:")
             for test, _ in self.failures:
-                print(f"{colored('[  FAILED  ]', 'red')} {type(test).__name__}.{test._testMethodName}")
+                self._emit(f"{colored('[  FAILED  ]', 'red')} {type(test).__name__}.{test._testMethodName}")
 
         if self.errors:
-            print(f"{colored('[  ERROR   ]', 'red')} {len(self.errors)} tests, listed below:")
+            self._emit(f"{colored('[  ERROR   ]', 'red')} {len(self.errors)} tests, listed below:")
             for test, _ in self.errors:
-                print(f"{colored('[  ERROR   ]', 'red')} {type(test).__name__}.{test._testMethodName}")
+                self._emit(f"{colored('[  ERROR   ]', 'red')} {type(test).__name__}.{test._testMethodName}")
 
         # Print unittest-style summary
         if self.verbose > 0:
-            print("\n----------------------------------------------------------------------")
-            print(f"Ran {self.testsRun} tests in {total_time:.3f}s")
+            self._emit("\n----------------------------------------------------------------------")
+            self._emit(f"Ran {self.testsRun} tests in {total_time:.3f}s")
 
             if self.wasSuccessful():
-                print("\nOK")
+                self._emit("\nOK")
             else:
-                print("\nFAILED", end="")
+                line = "\nFAILED"
                 if self.errors:
-                    print(" (errors={0})".format(len(self.errors)), end="")
+                    line += " (errors={0})".format(len(self.errors))
                 if self.failures:
-                    print(" (failures={0})".format(len(self.failures)), end="")
-                print()
+                    line += " (failures={0})".format(len(self.failures))
+                self._emit(line)
 
 
 class CustomTestRunner:
@@ -4,34 +4,49 @@ Integration tests for the audio capture to STT pipeline.
 
 import unittest
 import os
-import tempfile
 import time
 import threading
 import numpy as np
 
-from src.audio import AudioCapture
-from src.stt import WhisperSTT
+from tests.audio_fixtures import sample_times
+
+# Real-time factor budget: allow STT up to 3x the audio duration (min 1 s)
+STT_RTF_BUDGET = 3.0
+
+
+def _stt_timeout(duration_seconds):
+    """Return the transcription wait timeout for audio of the given duration."""
+    return max(1.0, STT_RTF_BUDGET * duration_seconds)
 
 
 class AudioToSTTPipelineTest(unittest.TestCase):
     """Test the integration between audio capture and STT modules."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared fixtures (PortAudio init and Whisper model load) once."""
+        # Imported here so test discovery doesn't pay for the audio/Whisper stacks
+        from src.audio import AudioCapture
+        from src.stt import WhisperSTT
+
+        cls.audio = AudioCapture(sample_rate=16000)  # 16kHz for Whisper
+        cls.stt = WhisperSTT(model_size="tiny")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down shared fixtures."""
+        cls.audio.stop_recording()
+        cls.stt.unload_model()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.audio = AudioCapture(sample_rate=16000)  # 16kHz for Whisper
-        self.stt = WhisperSTT(model_size="tiny")
-        self.temp_dir = tempfile.mkdtemp()
+        self.audio.stop_recording()
+        self.longMessage = True
         print("Running audio-to-STT integration tests...")
 
     def tearDown(self):
         """Tear down test fixtures."""
         self.audio.stop_recording()
-        self.stt.unload_model()
-
-        # Clean up temp directory
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        os.rmdir(self.temp_dir)
 
     def test_AudioToSTTPipeline(self):
         """Test the entire pipeline from audio capture to STT processing."""
@@ -41,7 +56,7 @@ class AudioToSTTPipelineTest(unittest.TestCase):
         # Create synthetic audio data (1 second of a sine wave at 440 Hz)
         sample_rate = 16000
         duration = 1.0  # seconds
-        t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
+        t = sample_times(duration, sample_rate)
         # Create a complex tone with harmonics for more realistic audio
         audio_data = (
             0.5 * np.sin(2 * np.pi * 440 * t) +
@@ -49,19 +64,9 @@ class AudioToSTTPipelineTest(unittest.TestCase):
             0.2 * np.sin(2 * np.pi * 1320 * t)
         )
 
-        # Convert to 16-bit PCM
+        # Convert to 16-bit PCM (passed straight to STT, no WAV round-trip)
         audio_data = (audio_data * 32767).astype(np.int16)
 
-        # Save to WAV file
-        temp_wav = os.path.join(self.temp_dir, "test_audio.wav")
-
-        import wave
-        with wave.open(temp_wav, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)  # 2 bytes for 16-bit
-            wf.setframerate(sample_rate)
-            wf.writeframes(audio_data.tobytes())
-
         # Synchronization event
         transcription_complete = threading.Event()
         transcription_result = None
@@ -74,21 +79,21 @@ class AudioToSTTPipelineTest(unittest.TestCase):
             confidence_score = confidence
             transcription_complete.set()
 
-        # Process the audio file through STT
-        print(f"Processing audio file: {temp_wav}")
+        # Process the audio data through STT
+        print(f"Processing {len(audio_data)} samples of synthetic audio")
         self.stt.transcribe_audio(audio_data, on_transcription)
 
-        # Wait for transcription to complete (with timeout)
-        transcription_complete.wait(timeout=30)
+        # Wait for transcription to complete within the real-time factor budget
+        transcription_complete.wait(timeout=_stt_timeout(duration))
+
+        # For synthetic audio, we're not testing correctness of transcription
+        # but rather that the pipeline completes without errors
+        self.assertTrue(transcription_complete.is_set(), "STT missed RTF=3 budget")
 
         # Verify results
         print(f"Transcription result: '{transcription_result}'")
         print(f"Confidence score: {confidence_score:.2f}")
 
-        # For synthetic audio, we're not testing correctness of transcription
-        # but rather that the pipeline completes without errors
-        self.assertTrue(transcription_complete.is_set())
-
         # Check that a confidence score was produced
         self.assertIsNotNone(confidence_score)
         self.assertIsInstance(confidence_score, float)
@@ -159,7 +164,8 @@ class AudioToSTTPipelineTest(unittest.TestCase):
         audio_data = self.audio.get_buffer_as_numpy()
 
         # Check if audio contains actual signal
-        audio_level = np.max(np.abs(audio_data.astype(np.float32) / 32768.0))
+        # Peak taken on the int16 samples directly (min/max avoids abs() overflow at -32768)
+        audio_level = max(int(audio_data.max()), -int(audio_data.min())) / 32768.0 if len(audio_data) else 0.0
         print(f"Maximum audio level: {audio_level:.4f}")
 
         if audio_level < 0.01:
@@ -169,17 +175,18 @@ class AudioToSTTPipelineTest(unittest.TestCase):
         print("Processing recorded audio through STT...")
         self.stt.transcribe_audio(audio_data, on_transcription)
 
-        # Wait for transcription to complete
-        transcription_complete.wait(timeout=30)
+        # Wait for transcription to complete within the real-time factor budget
+        duration = len(audio_data) / self.audio.sample_rate
+        transcription_complete.wait(timeout=_stt_timeout(duration))
+
+        # We don't check the content of the transcription,
+        # just that the pipeline completed successfully
+        self.assertTrue(transcription_complete.is_set(), "STT missed RTF=3 budget")
 
         # Print results
         print(f"Transcription result: '{transcription_result}'")
         print(f"Confidence score: {confidence_score:.2f}")
 
-        # We don't check the content of the transcription,
-        # just that the pipeline completed successfully
-        self.assertTrue(transcription_complete.is_set())
-
         # Check that a confidence score was produced
         self.assertIsNotNone(confidence_score)
         self.assertIsInstance(confidence_score, float)
@@ -3,6 +3,7 @@ Integration tests for the real-time audio processing pipeline.
 """
 
 import unittest
+import itertools
 import threading
 import time
 import os
@@ -17,26 +18,49 @@ from src.stt import WhisperSTT
 class RealTimePipelineTest(unittest.TestCase):
     """Integration tests for real-time audio processing pipeline."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Initialize components
-        self.audio = AudioCapture(
+    @classmethod
+    def setUpClass(cls):
+        """Create the audio capture and load the Whisper model once for all tests."""
+        cls.audio = AudioCapture(
             sample_rate=16000,
             chunk_size=1024,
             channels=1
         )
         
-        self.stt = WhisperSTT(
+        # Every test streams from the microphone, so skip the class (and the
+        # model load) outright on machines without an input device
+        if not cls.audio.get_available_devices():
+            del cls.audio
+            raise unittest.SkipTest("No audio input devices available")
+        
+        cls.stt = WhisperSTT(
             model_size="tiny",
             device="cpu",
             language="ja"
         )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Release the shared components."""
+        cls.audio.stop_recording()
+        cls.stt.unload_model()
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Start each test from idle components with nothing queued
+        self.audio.stop_recording()
+        self.stt.reset_state()
         
         # Set up result tracking
         self.results_lock = threading.Lock()
+        # Chunk count is bumped from the audio thread without a lock;
+        # next() on itertools.count is atomic under the GIL
+        self._chunk_counter = itertools.count(1)
         self.audio_chunks_processed = 0
         self.transcriptions = []
         self.confidences = []
+        # Written only by the STT worker thread, read without the lock
+        self._transcription_count = 0
         self.is_running = False
         
         print("Running real-time pipeline integration tests...")
@@ -45,15 +69,13 @@ class RealTimePipelineTest(unittest.TestCase):
         """Tear down test fixtures."""
         self.is_running = False
         self.audio.stop_recording()
-        self.stt.stop_continuous_processing()
-        self.stt.unload_model()
+        self.stt.reset_state()
 
     def _audio_chunk_callback(self, chunk):
         """Handle audio chunks from continuous mode."""
-        with self.results_lock:
-            self.audio_chunks_processed += 1
+        self.audio_chunks_processed = next(self._chunk_counter)
         
-        # Forward to STT for processing
+        # Forward to STT; its worker batches queued chunks into super-segments
         self.stt.process_audio_chunk(chunk)
     
     def _transcription_callback(self, text, confidence):
@@ -62,6 +84,7 @@ class RealTimePipelineTest(unittest.TestCase):
             print(f"Transcription: '{text}' (confidence: {confidence:.2f})")
             self.transcriptions.append(text)
             self.confidences.append(confidence)
+        self._transcription_count += 1
     
     def test_BasicPipeline(self):
         """Test the basic integration of audio capture and STT."""
@@ -72,7 +95,6 @@ class RealTimePipelineTest(unittest.TestCase):
         
         # Start audio capture with continuous mode
         self.audio.start_recording(
-            audio_level_callback=lambda level: None,  # Dummy callback
             chunk_processing_callback=self._audio_chunk_callback,
             continuous_mode=True
         )
@@ -91,9 +113,8 @@ class RealTimePipelineTest(unittest.TestCase):
         self.stt.stop_continuous_processing()
         
         # Check results
-        with self.results_lock:
-            print(f"Audio chunks processed: {self.audio_chunks_processed}")
-            print(f"Transcriptions received: {len(self.transcriptions)}")
+        print(f"Audio chunks processed: {self.audio_chunks_processed}")
+        print(f"Transcriptions received: {self._transcription_count}")
         
         # The test passes if the system doesn't crash
         # We don't assert specific output since it depends on whether there was actual audio
@@ -115,7 +136,6 @@ class RealTimePipelineTest(unittest.TestCase):
         
         # Start audio capture with continuous mode
         self.audio.start_recording(
-            audio_level_callback=lambda level: None,  # Dummy callback
             chunk_processing_callback=self._audio_chunk_callback,
             continuous_mode=True
         )
@@ -127,28 +147,43 @@ class RealTimePipelineTest(unittest.TestCase):
         test_duration = 15.0  # seconds
         check_interval = 1.0  # seconds
         
-        # Metrics tracking
+        # Metrics tracking in preallocated arrays (one slot per check interval)
+        n_samples = int(test_duration / check_interval) + 1
         metrics = {
-            "cpu_usage": [],
-            "memory_usage": [],
-            "chunks_processed": [],
-            "transcriptions": []
+            "cpu_usage": np.empty(n_samples, dtype=np.float32),
+            "memory_usage": np.empty(n_samples, dtype=np.float32),
+            "chunks_processed": np.empty(n_samples, dtype=np.int64),
+            "transcriptions": np.empty(n_samples, dtype=np.int64)
         }
+        n = 0
         
-        print(f"Running extended pipeline test for {test_duration} seconds...")
-        start_time = time.time()
+        # Sample metrics on a daemon thread so the foreground just waits
+        stop_event = threading.Event()
         
-        while time.time() - start_time < test_duration:
-            # Record metrics
-            metrics["cpu_usage"].append(process.cpu_percent())
-            metrics["memory_usage"].append(process.memory_info().rss / 1024 / 1024)  # MB
-            
-            with self.results_lock:
-                metrics["chunks_processed"].append(self.audio_chunks_processed)
-                metrics["transcriptions"].append(len(self.transcriptions))
-            
-            # Sleep for interval
-            time.sleep(check_interval)
+        def sample_metrics():
+            nonlocal n
+            while n < n_samples and not stop_event.is_set():
+                # Record metrics
+                info = process.as_dict(attrs=['cpu_percent', 'memory_info'])
+                metrics["cpu_usage"][n] = info['cpu_percent']
+                metrics["memory_usage"][n] = info['memory_info'].rss / (1024 * 1024)
+                
+                metrics["chunks_processed"][n] = self.audio_chunks_processed
+                metrics["transcriptions"][n] = self._transcription_count
+                n += 1
+                
+                # Wait for the next interval
+                stop_event.wait(check_interval)
+        
+        # Prime the CPU delta so the first non-blocking sample is meaningful
+        process.cpu_percent(interval=None)
+        metrics_thread = threading.Thread(target=sample_metrics, daemon=True)
+        
+        print(f"Running extended pipeline test for {test_duration} seconds...")
+        metrics_thread.start()
+        stop_event.wait(test_duration)
+        stop_event.set()
+        metrics_thread.join(timeout=2.0)
         
         # Stop the pipeline
         self.audio.stop_recording()
@@ -156,12 +191,12 @@ class RealTimePipelineTest(unittest.TestCase):
         self.stt.stop_continuous_processing()
         
         # Calculate metrics
-        avg_cpu = sum(metrics["cpu_usage"]) / len(metrics["cpu_usage"]) if metrics["cpu_usage"] else 0
-        avg_memory = sum(metrics["memory_usage"]) / len(metrics["memory_usage"]) if metrics["memory_usage"] else 0
+        avg_cpu = float(metrics["cpu_usage"][:n].mean()) if n else 0
+        avg_memory = float(metrics["memory_usage"][:n].mean()) if n else 0
         
         # Calculate processing rates
-        if len(metrics["chunks_processed"]) > 1:
-            chunks_rate = (metrics["chunks_processed"][-1] - metrics["chunks_processed"][0]) / test_duration
+        if n > 1:
+            chunks_rate = (metrics["chunks_processed"][n - 1] - metrics["chunks_processed"][0]) / test_duration
         else:
             chunks_rate = 0
             
@@ -170,8 +205,9 @@ class RealTimePipelineTest(unittest.TestCase):
         print(f"  - Average CPU: {avg_cpu:.2f}%")
         print(f"  - Average Memory: {avg_memory:.2f} MB")
         print(f"  - Audio Processing Rate: {chunks_rate:.2f} chunks/sec")
-        print(f"  - Final Chunks Processed: {metrics['chunks_processed'][-1]}")
-        print(f"  - Final Transcriptions: {metrics['transcriptions'][-1]}")
+        if n:
+            print(f"  - Final Chunks Processed: {metrics['chunks_processed'][n - 1]}")
+            print(f"  - Final Transcriptions: {metrics['transcriptions'][n - 1]}")
         
         # Verify no excessive resource usage
         self.assertLess(avg_cpu, 300.0, "CPU usage too high during extended operation")  # Increased threshold for CPU usage
@@ -185,10 +221,12 @@ class RealTimePipelineTest(unittest.TestCase):
             print(f"Start/stop cycle {cycle}/{cycles}")
             
             # Reset counters
+            self._chunk_counter = itertools.count(1)
+            self.audio_chunks_processed = 0
             with self.results_lock:
-                self.audio_chunks_processed = 0
                 self.transcriptions = []
                 self.confidences = []
+            self._transcription_count = 0
             
             # Start pipeline
             self.stt.start_continuous_processing(
@@ -196,7 +234,6 @@ class RealTimePipelineTest(unittest.TestCase):
             )
             
             self.audio.start_recording(
-                audio_level_callback=lambda level: None,
                 chunk_processing_callback=self._audio_chunk_callback,
                 continuous_mode=True
             )
@@ -208,13 +245,15 @@ class RealTimePipelineTest(unittest.TestCase):
             self.audio.stop_recording()
             time.sleep(0.5)
             self.stt.stop_continuous_processing()
+            
+            # Drop leftover audio but keep the model loaded for the next cycle
+            self.stt.reset_state()
             time.sleep(0.5)
             
             # Report results for this cycle
-            with self.results_lock:
-                print(f"  - Cycle {cycle} results:")
-                print(f"    - Audio chunks: {self.audio_chunks_processed}")
-                print(f"    - Transcriptions: {len(self.transcriptions)}")
+            print(f"  - Cycle {cycle} results:")
+            print(f"    - Audio chunks: {self.audio_chunks_processed}")
+            print(f"    - Transcriptions: {self._transcription_count}")
         
         # The test passes if we can complete all cycles without error
         self.assertEqual(cycle, cycles, f"Completed {cycles} start/stop cycles")
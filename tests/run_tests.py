@@ -9,15 +9,93 @@ Usage:
     python -m tests.run_tests          # Run all tests
     python -m tests.run_tests audio    # Run only audio tests
     python -m tests.run_tests stt      # Run only speech-to-text tests
+    python -m tests.run_tests -q       # Run all tests, printing only the summary
 """
 
 import sys
 import unittest
 import argparse
-import importlib
+import json
 import os
+from fnmatch import fnmatchcase
+from pathlib import Path
 from tests.custom_test_runner import CustomTestRunner
 
+# Test packages selectable from the command line
+_TEST_REGISTRY = {
+    "audio": "tests.audio",
+    "stt": "tests.stt",
+    "integration": "tests.integration",
+}
+
+# Cached list of test modules, keyed on the test directories' mtimes
+_TEST_INDEX_CACHE = Path.home() / ".cache" / "koelingo" / "test_index.json"
+
+
+def _test_dirs(start_dir):
+    """
+    List the test package directories under start_dir with their mtimes.
+
+    Args:
+        start_dir: Root test directory
+
+    Returns:
+        list: (relative path, st_mtime_ns) pairs, root first
+    """
+    dirs = []
+    pending = [start_dir]
+    while pending:
+        path = pending.pop()
+        dirs.append((os.path.relpath(path, start_dir), os.stat(path).st_mtime_ns))
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name != "__pycache__" and \
+                        os.path.exists(os.path.join(entry.path, "__init__.py")):
+                    pending.append(entry.path)
+    return sorted(dirs)
+
+
+def _load_test_index(start_dir):
+    """
+    Return the dotted names of all test modules under start_dir.
+
+    The list is cached on disk and rebuilt only when a test directory's
+    mtime changes (i.e. a file was added, removed or renamed).
+
+    Args:
+        start_dir: Root test directory (the `tests` package)
+
+    Returns:
+        list: Module names such as "tests.audio.test_audio_capture"
+    """
+    dirs = _test_dirs(start_dir)
+    # Lists rather than tuples so the key compares equal after a JSON round trip
+    key = [os.path.abspath(start_dir), [list(d) for d in dirs]]
+
+    try:
+        cached = json.loads(_TEST_INDEX_CACHE.read_text())
+        if cached["key"] == key:
+            return cached["modules"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    package = os.path.basename(os.path.abspath(start_dir))
+    modules = []
+    for rel_dir, _ in dirs:
+        dir_path = os.path.join(start_dir, rel_dir)
+        prefix = package if rel_dir == "." else f"{package}.{rel_dir.replace(os.sep, '.')}"
+        for name in sorted(os.listdir(dir_path)):
+            if fnmatchcase(name, "test_*.py"):
+                modules.append(f"{prefix}.{name[:-3]}")
+
+    try:
+        _TEST_INDEX_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _TEST_INDEX_CACHE.write_text(json.dumps({"key": key, "modules": modules}))
+    except OSError:
+        pass
+
+    return modules
+
 
 def discover_tests(test_module=None):
     """
@@ -29,46 +107,44 @@ def discover_tests(test_module=None):
     Returns:
         unittest.TestSuite: The test suite to run
     """
+    start_dir = os.path.dirname(os.path.abspath(__file__))
     if test_module:
-        # Try to import and get the module's tests
-        try:
-            # Try direct module import first
-            module_path = f"tests.{test_module}"
-            try:
-                module = importlib.import_module(module_path)
-                print(f"Imported module: {module_path}")
-                return unittest.defaultTestLoader.loadTestsFromModule(module)
-            except ImportError:
-                print(f"Module {module_path} not found directly, trying submodules...")
-
-            # If direct import fails, try to discover tests in the module directory
-            test_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), test_module)
-            if os.path.isdir(test_dir):
-                print(f"Discovering tests in directory: {test_dir}")
-                # Use pattern that matches both TestXXX and XXXTest classes
-                return unittest.defaultTestLoader.discover(test_dir, pattern="test_*.py")
-            else:
-                print(f"Error: Test directory 'tests/{test_module}' not found.")
-                sys.exit(1)
-
-        except Exception as e:
-            print(f"Error discovering tests for module '{test_module}': {e}")
+        # Accept a registered package ("stt") or a module within it ("stt.test_performance")
+        package, _, submodule = test_module.partition(".")
+        target = _TEST_REGISTRY.get(package)
+        if target is None:
+            print(f"Error: Unknown test module '{test_module}'. "
+                  f"Choose from: {', '.join(sorted(_TEST_REGISTRY))}")
+            sys.exit(1)
+        if submodule:
+            target = f"{target}.{submodule}"
+
+        # Load the matching test modules straight from the index
+        names = [name for name in _load_test_index(start_dir)
+                 if name == target or name.startswith(f"{target}.")]
+        if not names:
+            print(f"Error: No tests found for '{test_module}'.")
             sys.exit(1)
-    else:
-        # Discover all tests
-        start_dir = os.path.dirname(os.path.abspath(__file__))
-        print(f"Discovering all tests in: {start_dir}")
-        return unittest.defaultTestLoader.discover(start_dir)
+
+        print(f"Loading tests from: {target}")
+        return unittest.defaultTestLoader.loadTestsFromNames(names)
+
+    # Discover all tests
+    print(f"Discovering all tests in: {start_dir}")
+    return unittest.defaultTestLoader.loadTestsFromNames(_load_test_index(start_dir))
 
 
 def main():
     """Run the tests based on command line arguments."""
     parser = argparse.ArgumentParser(description="Run KoeLingo tests")
-    parser.add_argument("module", nargs="?", help="Specific test module to run (e.g., audio, stt)")
+    parser.add_argument("module", nargs="?",
+                        help=f"Specific test module to run ({', '.join(sorted(_TEST_REGISTRY))}, "
+                             "or e.g. stt.test_performance)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the final summary")
     args = parser.parse_args()
 
-    verbosity = 2 if args.verbose else 1
+    verbosity = 2 if args.verbose else 0 if args.quiet else 1
     runner = CustomTestRunner(verbosity=verbosity)
 
     test_suite = discover_tests(args.module)
@@ -9,13 +9,13 @@ import os
 import sys
 import time
 import argparse
+import itertools
 import threading
 import logging
 import traceback
 from datetime import datetime, timedelta
 import psutil
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -37,7 +37,7 @@ logger = logging.getLogger(__name__)
 class StabilityTest:
     """Extended stability testing for continuous processing."""
     
-    def __init__(self, test_duration=300, model_size="tiny", use_ctranslate2=True):
+    def __init__(self, test_duration=300, model_size="tiny", use_ctranslate2=True, csv_only=False):
         """
         Initialize the stability test.
         
@@ -45,10 +45,12 @@ class StabilityTest:
             test_duration: Duration in seconds (default: 5 minutes)
             model_size: Whisper model size (default: tiny)
             use_ctranslate2: Whether to use CTranslate2 (default: True)
+            csv_only: Write metrics to CSV instead of plotting (default: False)
         """
         self.test_duration = test_duration
         self.model_size = model_size
         self.use_ctranslate2 = use_ctranslate2
+        self.csv_only = csv_only
         
         # Set up components
         self.audio = None
@@ -56,21 +58,27 @@ class StabilityTest:
         
         # Setup tracking
         self.lock = threading.Lock()
+        # Counters updated from the audio and STT threads without taking self.lock
+        self._chunk_counter = itertools.count(1)
         self.audio_chunks = 0
         self.audio_levels = []
         self.transcriptions = []
         self.confidences = []
+        self._transcription_count = 0
         self.is_running = False
+        self._stop_event = threading.Event()
         
-        # Metrics tracking
+        # Metrics tracking, one preallocated array per metric sampled at 1 Hz
+        n_samples = int(test_duration) + 8
         self.metrics = {
-            "timestamp": [],
-            "cpu_usage": [],
-            "memory_usage": [],
-            "audio_chunks": [],
-            "transcriptions": [],
-            "queue_size": []
+            "timestamp": np.empty(n_samples, dtype=np.float32),
+            "cpu_usage": np.empty(n_samples, dtype=np.float32),
+            "memory_usage": np.empty(n_samples, dtype=np.float32),
+            "audio_chunks": np.empty(n_samples, dtype=np.int64),
+            "transcriptions": np.empty(n_samples, dtype=np.int64),
+            "queue_size": np.empty(n_samples, dtype=np.int64)
         }
+        self._midx = 0  # Number of samples recorded
         
         # Set up process for monitoring
         self.process = psutil.Process(os.getpid())
@@ -82,8 +90,11 @@ class StabilityTest:
     
     def chunk_callback(self, chunk):
         """Handle audio chunk processing."""
-        with self.lock:
-            self.audio_chunks += 1
+        self.audio_chunks = next(self._chunk_counter)
+        
+        # Forward to STT; its worker batches queued chunks into super-segments
+        if self.stt:
+            self.stt.process_audio_chunk(chunk)
     
     def transcription_callback(self, text, confidence):
         """Handle transcription results."""
@@ -91,35 +102,42 @@ class StabilityTest:
             logger.info(f"Transcription: '{text}' (confidence: {confidence:.2f})")
             self.transcriptions.append(text)
             self.confidences.append(confidence)
+        self._transcription_count += 1
     
     def collect_metrics(self):
         """Collect system metrics at regular intervals."""
         while self.is_running:
             try:
                 # Get current metrics
-                current_time = time.time() - self.start_time
-                cpu_percent = self.process.cpu_percent()
-                memory_mb = self.process.memory_info().rss / 1024 / 1024
+                current_time = (time.monotonic_ns() - self._start_ns) * 1e-9
+                
+                # One psutil call gathers both values from /proc
+                info = self.process.as_dict(attrs=['cpu_percent', 'memory_info'])
+                cpu_percent = info['cpu_percent']
+                memory_mb = info['memory_info'].rss / (1024 * 1024)
                 
-                with self.lock:
-                    chunks = self.audio_chunks
-                    transcription_count = len(self.transcriptions)
+                chunks = self.audio_chunks
+                transcription_count = self._transcription_count
                 
                 # Get queue size if available
                 queue_size = 0
                 if self.stt and hasattr(self.stt, '_audio_queue'):
-                    queue_size = self.stt._audio_queue.qsize()
+                    queue_size = self.stt._audio_queue.size()
                 
                 # Record metrics
-                self.metrics["timestamp"].append(current_time)
-                self.metrics["cpu_usage"].append(cpu_percent)
-                self.metrics["memory_usage"].append(memory_mb)
-                self.metrics["audio_chunks"].append(chunks)
-                self.metrics["transcriptions"].append(transcription_count)
-                self.metrics["queue_size"].append(queue_size)
+                i = self._midx
+                if i < len(self.metrics["timestamp"]):
+                    self.metrics["timestamp"][i] = current_time
+                    self.metrics["cpu_usage"][i] = cpu_percent
+                    self.metrics["memory_usage"][i] = memory_mb
+                    self.metrics["audio_chunks"][i] = chunks
+                    self.metrics["transcriptions"][i] = transcription_count
+                    self.metrics["queue_size"][i] = queue_size
+                    self._midx = i + 1
                 
-                # Log current status
-                if int(current_time) % 30 == 0:  # Log every 30 seconds
+                # Log current status every 30 seconds
+                if current_time >= self._next_status_log_s:
+                    self._next_status_log_s = (int(current_time) // 30 + 1) * 30
                     logger.info(f"Status at {int(current_time)}s: "
                              f"CPU={cpu_percent:.1f}%, "
                              f"Memory={memory_mb:.1f}MB, "
@@ -127,8 +145,16 @@ class StabilityTest:
                              f"Transcriptions={transcription_count}, "
                              f"Queue={queue_size}")
                 
-                # Sleep for a second
-                time.sleep(1)
+                # Print progress every 5%, once per bucket
+                progress = int((current_time / self.test_duration) * 100)
+                if progress >= self._next_log_pct:
+                    self._next_log_pct = progress + 5 - (progress % 5)
+                    remaining = self.test_duration - current_time
+                    eta = datetime.now() + timedelta(seconds=remaining)
+                    logger.info(f"Progress: {progress}% (ETA: {eta.strftime('%H:%M:%S')})")
+                
+                # Wait a second, waking early if the test is stopped
+                self._stop_event.wait(1)
                 
             except Exception as e:
                 logger.error(f"Error collecting metrics: {e}")
@@ -173,7 +199,11 @@ class StabilityTest:
             
             # Set running flag
             self.is_running = True
-            self.start_time = time.time()
+            self._stop_event.clear()
+            self._next_log_pct = 0
+            self._next_status_log_s = 0
+            # Monotonic clock so NTP adjustments can't skew elapsed time
+            self._start_ns = time.monotonic_ns()
             
             # Start metrics collection thread
             metrics_thread = threading.Thread(target=self.collect_metrics)
@@ -192,30 +222,17 @@ class StabilityTest:
                 continuous_mode=True
             )
             
-            # Calculate end time
-            end_time = self.start_time + self.test_duration
-            
             # Display initial progress
             logger.info("Test running...")
             
-            # Wait for test to complete
-            while time.time() < end_time and self.is_running:
-                # Calculate progress
-                elapsed = time.time() - self.start_time
-                progress = int((elapsed / self.test_duration) * 100)
-                
-                # Print progress every 5%
-                if progress % 5 == 0:
-                    remaining = self.test_duration - elapsed
-                    eta = datetime.now() + timedelta(seconds=remaining)
-                    logger.info(f"Progress: {progress}% (ETA: {eta.strftime('%H:%M:%S')})")
-                
-                # Sleep a bit to avoid busy waiting
-                time.sleep(5)
+            # Block until the test duration elapses or the test is stopped;
+            # progress is logged by the metrics thread
+            self._stop_event.wait(timeout=self.test_duration)
             
             # Clean up
             logger.info("Test complete, cleaning up...")
             self.is_running = False
+            self._stop_event.set()
             
             # Stop audio and STT
             self.audio.stop_recording()
@@ -235,6 +252,7 @@ class StabilityTest:
         except KeyboardInterrupt:
             logger.info("Test interrupted by user")
             self.is_running = False
+            self._stop_event.set()
             self.audio.stop_recording()
             self.stt.stop_continuous_processing()
             self.stt.unload_model()
@@ -244,6 +262,7 @@ class StabilityTest:
             logger.error(f"Error during stability test: {e}")
             logger.error(traceback.format_exc())
             self.is_running = False
+            self._stop_event.set()
             if self.audio:
                 self.audio.stop_recording()
             if self.stt:
@@ -255,20 +274,20 @@ class StabilityTest:
         """Process and report test results."""
         try:
             # Calculate summary statistics
-            if not self.metrics["timestamp"]:
+            n = self._midx
+            if not n:
                 logger.error("No metrics collected during test")
                 return
             
-            # Calculate averages and max values
-            avg_cpu = sum(self.metrics["cpu_usage"]) / len(self.metrics["cpu_usage"])
-            avg_memory = sum(self.metrics["memory_usage"]) / len(self.metrics["memory_usage"])
-            max_cpu = max(self.metrics["cpu_usage"])
-            max_memory = max(self.metrics["memory_usage"])
-            max_queue = max(self.metrics["queue_size"])
+            # Calculate averages and max values for every metric in one sweep
+            stats = {key: (values[:n].mean(), values[:n].max()) for key, values in self.metrics.items()}
+            avg_cpu, max_cpu = stats["cpu_usage"]
+            avg_memory, max_memory = stats["memory_usage"]
+            max_queue = stats["queue_size"][1]
             
             # Calculate processing rates
-            final_chunks = self.metrics["audio_chunks"][-1]
-            final_transcriptions = self.metrics["transcriptions"][-1]
+            final_chunks = int(self.metrics["audio_chunks"][n - 1])
+            final_transcriptions = int(self.metrics["transcriptions"][n - 1])
             chunks_per_second = final_chunks / self.test_duration
             
             # Log results
@@ -290,22 +309,52 @@ class StabilityTest:
             logger.info(f"  - Audio to Transcription Ratio: {final_transcriptions/final_chunks if final_chunks else 0:.4f}")
             logger.info(f"{'='*50}")
             
-            # Create plots
-            self.plot_results()
+            # Save raw metrics or create plots
+            if self.csv_only:
+                self.save_csv()
+            else:
+                self.plot_results()
             
         except Exception as e:
             logger.error(f"Error generating report: {e}")
             logger.error(traceback.format_exc())
     
+    def save_csv(self):
+        """Write the recorded metrics to a CSV file."""
+        try:
+            n = self._midx
+            keys = list(self.metrics)
+            np.savetxt(
+                "stability_test_results.csv",
+                np.column_stack([self.metrics[key][:n] for key in keys]),
+                delimiter=",",
+                header=",".join(keys),
+                comments=""
+            )
+            logger.info("Saved metrics to stability_test_results.csv")
+            
+        except Exception as e:
+            logger.error(f"Error writing CSV: {e}")
+            logger.error(traceback.format_exc())
+    
     def plot_results(self):
         """Create and save charts of the test results."""
         try:
+            # Import lazily; matplotlib is heavy and only needed for plots
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+            
+            # Only the recorded prefix of each metric array is valid
+            n = self._midx
+            metrics = {key: values[:n] for key, values in self.metrics.items()}
+            
             # Create figure with subplots
             plt.figure(figsize=(12, 10))
             
             # Plot CPU usage
             plt.subplot(3, 1, 1)
-            plt.plot(self.metrics["timestamp"], self.metrics["cpu_usage"])
+            plt.plot(metrics["timestamp"], metrics["cpu_usage"])
             plt.title("CPU Usage")
             plt.xlabel("Time (seconds)")
             plt.ylabel("CPU (%)")
@@ -313,7 +362,7 @@ class StabilityTest:
             
             # Plot memory usage
             plt.subplot(3, 1, 2)
-            plt.plot(self.metrics["timestamp"], self.metrics["memory_usage"])
+            plt.plot(metrics["timestamp"], metrics["memory_usage"])
             plt.title("Memory Usage")
             plt.xlabel("Time (seconds)")
             plt.ylabel("Memory (MB)")
@@ -321,9 +370,9 @@ class StabilityTest:
             
             # Plot queue size and processed chunks
             plt.subplot(3, 1, 3)
-            plt.plot(self.metrics["timestamp"], self.metrics["queue_size"], label="Queue Size")
-            plt.plot(self.metrics["timestamp"], 
-                     [c - self.metrics["audio_chunks"][0] for c in self.metrics["audio_chunks"]], 
+            plt.plot(metrics["timestamp"], metrics["queue_size"], label="Queue Size")
+            plt.plot(metrics["timestamp"], 
+                     metrics["audio_chunks"] - metrics["audio_chunks"][0], 
                      label="Chunks Processed")
             plt.title("Processing Performance")
             plt.xlabel("Time (seconds)")
@@ -362,6 +411,11 @@ def main():
         action="store_true", 
         help="Disable CTranslate2 optimization"
     )
+    parser.add_argument(
+        "--csv-only", 
+        action="store_true", 
+        help="Write metrics to CSV instead of plotting (skips matplotlib)"
+    )
     
     args = parser.parse_args()
     
@@ -369,7 +423,8 @@ def main():
     test = StabilityTest(
         test_duration=args.duration,
         model_size=args.model,
-        use_ctranslate2=not args.no_ctranslate2
+        use_ctranslate2=not args.no_ctranslate2,
+        csv_only=args.csv_only
     )
     
     success = test.run()
@@ -3,62 +3,79 @@ Tests for continuous speech-to-text processing functionality.
 """
 
 import unittest
+import gc
 import os
 import tempfile
 import time
 import threading
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
 
 # Import the necessary classes
 from src.stt import WhisperSTT
+from src.stt.whisper_stt import MAX_AUDIO_QUEUE_SIZE
+from tests.audio_fixtures import make_tone
 
 
 class MockSTTCallback:
     """Mock callback class for testing STT processing."""
     
     def __init__(self):
-        self.transcriptions = []
-        self.confidences = []
-        self.lock = threading.Lock()
+        # deque append/iterate/clear are thread-safe, so no lock is needed
+        self.transcriptions = deque()
+        self.confidences = deque()
         
     def transcription_callback(self, text, confidence):
         """Store the transcription results."""
-        with self.lock:
-            print(f"Transcribed: '{text}' (confidence: {confidence:.2f})")
-            self.transcriptions.append(text)
-            self.confidences.append(confidence)
+        print(f"Transcribed: '{text}' (confidence: {confidence:.2f})")
+        self.transcriptions.append(text)
+        self.confidences.append(confidence)
     
     def get_transcriptions(self):
         """Get current transcriptions."""
-        with self.lock:
-            return self.transcriptions.copy()
+        return list(self.transcriptions)
             
     def get_confidences(self):
         """Get current confidence scores."""
-        with self.lock:
-            return self.confidences.copy()
+        return list(self.confidences)
             
     def clear(self):
         """Clear stored data."""
-        with self.lock:
-            self.transcriptions = []
-            self.confidences = []
+        self.transcriptions.clear()
+        self.confidences.clear()
 
 
 class ContinuousSTTTest(unittest.TestCase):
     """Test cases for continuous speech-to-text processing."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Load the model once for all tests in this class."""
+        cls.stt = WhisperSTT(model_size="tiny", language="ja")
+        cls.callback = MockSTTCallback()
+        # Seeded low-level noise generated once and pushed as read-only views; the
+        # audio ring copies on push, so no per-chunk buffer is allocated
+        cls._rng = np.random.default_rng(0)
+        cls._noise_pool = cls._rng.integers(-1000, 1000, size=2 * 16000, dtype=np.int16, endpoint=True)
+        cls._noise_pool.flags.writeable = False
+
+    @classmethod
+    def tearDownClass(cls):
+        """Unload the shared model."""
+        cls.stt.unload_model()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.stt = WhisperSTT(model_size="tiny", language="ja")
-        self.callback = MockSTTCallback()
+        # Only reset state between tests; the model stays loaded
+        self.stt.reset_state()
+        self.callback.clear()
         print("Running continuous STT tests...")
 
     def tearDown(self):
         """Tear down test fixtures."""
         self.stt.stop_continuous_processing()
-        self.stt.unload_model()
         
     def test_ContinuousProcessingMode(self):
         """Test starting and stopping continuous processing mode."""
@@ -84,6 +101,23 @@ class ContinuousSTTTest(unittest.TestCase):
         # Verify flags
         self.assertFalse(self.stt._continuous_active)
     
+    def test_ResetState(self):
+        """Test resetting continuous state without unloading the model."""
+        self.stt.start_continuous_processing(
+            callback=self.callback.transcription_callback
+        )
+        self.stt.stop_continuous_processing()
+        
+        # Queue audio while the worker is stopped, then reset
+        chunk = np.zeros(1600, dtype=np.int16)
+        self.stt._audio_queue.push(chunk)
+        self.stt.reset_state()
+        
+        self.assertTrue(self.stt._audio_queue.empty())
+        self.assertFalse(self.stt._continuous_active)
+        self.assertFalse(self.stt.is_processing())
+        self.assertTrue(self.stt.is_loaded)
+    
     def test_AudioChunkProcessing(self):
         """Test processing audio chunks through the queue."""
         # Start continuous processing
@@ -91,14 +125,8 @@ class ContinuousSTTTest(unittest.TestCase):
             callback=self.callback.transcription_callback
         )
         
-        # Generate test audio - a simple sine wave tone
-        sample_rate = 16000
-        duration = 3.0  # seconds
-        frequency = 440.0  # A4 tone
-        
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        tone = np.sin(2 * np.pi * frequency * t) * 32767
-        audio_chunk = tone.astype(np.int16)
+        # Generate test audio - a 3 second A4 sine wave tone
+        audio_chunk = make_tone(440.0, 3.0)
         
         # Process the chunk
         self.stt.process_audio_chunk(audio_chunk)
@@ -106,115 +134,146 @@ class ContinuousSTTTest(unittest.TestCase):
         # Wait for processing to complete (may take some time)
         print("Waiting for audio chunk processing...")
         
-        # Wait up to 10 seconds for a result
-        max_wait = 10
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            if len(self.callback.get_transcriptions()) > 0:
-                break
-            time.sleep(0.5)
+        # Wait up to 10 seconds for the worker to finish processing the chunk
+        self.assertTrue(self.stt.wait_until_idle(timeout=10))
         
-        # Stop continuous processing
+        # Stop continuous processing (joins the worker after the chunk is handled)
         self.stt.stop_continuous_processing()
         
-        # The result might be empty or contain noise recognition
-        # The main test is that no exceptions occur
+        # A pure tone is rejected by the voice-activity gate, so Whisper never
+        # runs and no transcription is reported
         transcriptions = self.callback.get_transcriptions()
         print(f"Number of transcriptions: {len(transcriptions)}")
-        for i, text in enumerate(transcriptions):
-            print(f"Transcription {i+1}: {text}")
+        self.assertEqual(transcriptions, [])
     
     def test_QueueHandling(self):
         """Test the queue handling functionality."""
+        chunk_duration = 0.5  # seconds
+        sample_rate = 16000
+        sample_count = int(sample_rate * chunk_duration)
+        
+        # Queued chunks are drained into one super-segment for a single model call
+        for i in range(3):
+            self.stt._audio_queue.push(self._noise_pool[i * sample_count:(i + 1) * sample_count])
+        audio, cu_seqlens = self.stt._drain_super_segment()
+        self.assertEqual(len(audio), 3 * sample_count)
+        np.testing.assert_array_equal(cu_seqlens, [sample_count, 2 * sample_count, 3 * sample_count])
+        self.assertTrue(self.stt._audio_queue.empty())
+        self.assertIsNone(self.stt._drain_super_segment())
+        
         # Start continuous processing
         self.stt.start_continuous_processing(
             callback=self.callback.transcription_callback
         )
         
         # Add multiple small chunks to the queue
-        chunk_duration = 0.5  # seconds
-        sample_rate = 16000
-        sample_count = int(sample_rate * chunk_duration)
-        
         for i in range(3):  # Send 3 chunks
-            # Generate simple chunk of audio
-            chunk = np.random.randint(-1000, 1000, sample_count, dtype=np.int16)
+            # Take the next slice of the shared noise buffer
+            chunk = self._noise_pool[i * sample_count:(i + 1) * sample_count]
             self.stt.process_audio_chunk(chunk)
             print(f"Added chunk {i+1} to processing queue")
         
         # Verify queue size
-        time.sleep(0.5)  # Wait briefly for queuing
-        queue_size = self.stt._audio_queue.qsize()
+        queue_size = self.stt._audio_queue.size()
         print(f"Queue size after adding chunks: {queue_size}")
         
-        # Wait for queue to be processed
-        max_wait = 10  # seconds
-        start_time = time.time()
-        while not self.stt._audio_queue.empty() and time.time() - start_time < max_wait:
-            time.sleep(0.5)
-            print("Waiting for queue to empty...")
+        # Wait for the worker to signal that all queued audio has been processed
+        print("Waiting for queue to empty...")
+        self.assertTrue(self.stt.wait_until_idle(timeout=10))
         
         # Stop continuous processing
         self.stt.stop_continuous_processing()
         
-        # Final queue size should be 0 or close to 0
-        final_queue_size = self.stt._audio_queue.qsize()
+        # The worker takes everything queued in one pass, so the queue should be empty
+        final_queue_size = self.stt._audio_queue.size()
         print(f"Final queue size: {final_queue_size}")
+        self.assertEqual(final_queue_size, 0)
+    
+    def test_QueueBackpressure(self):
+        """Test process_audio_chunk refuses and counts chunks once the queue is full."""
+        # Mark continuous mode active without a worker thread so nothing drains
+        # the queue and process_audio_chunk does not start one
+        self.stt.reset_state()
+        self.stt._continuous_active = True
+        chunk = np.zeros(1600, dtype=np.int16)
+        try:
+            for _ in range(MAX_AUDIO_QUEUE_SIZE):
+                self.assertTrue(self.stt.process_audio_chunk(chunk))
+            
+            dropped_before = self.stt._dropped_chunks
+            self.assertFalse(self.stt.process_audio_chunk(chunk))
+            self.assertEqual(self.stt._dropped_chunks, dropped_before + 1)
+            self.assertEqual(self.stt._audio_queue.size(), MAX_AUDIO_QUEUE_SIZE)
+        finally:
+            self.stt.reset_state()
     
     def test_ExtendedOperation(self):
         """Test extended operation for stability."""
         test_duration = 20.0  # Run for 20 seconds to test stability
         
+        dropped_before = self.stt._dropped_chunks
+        
         # Start continuous processing
         self.stt.start_continuous_processing(
             callback=self.callback.transcription_callback
         )
         
         # Monitor memory and performance during extended operation
-        start_time = time.time()
         check_interval = 1.0  # Check every second
-        
-        # Track metrics
-        metrics = {
-            "cpu_usage": [],
-            "memory_usage": [],
-            "queue_size": [],
-            "is_processing": []
-        }
+        push_interval = 5.0  # Add a chunk every 5 seconds
         
         try:
             # Monitor resource usage during the test
             import psutil
             process = psutil.Process(os.getpid())
             
-            # Periodically add data to the queue
-            chunk_size = 16000  # 1 second of audio at 16kHz
+            # Metrics are sampled out-of-band into one preallocated structured
+            # array; only the sampler thread writes it, so no lock is needed
+            n_samples = int(test_duration / check_interval) + 1
+            metrics = np.empty(n_samples, dtype=[('cpu', 'f4'), ('mem', 'f4'), ('q', 'i4'), ('proc', '?')])
+            n = 0
+            stop_event = threading.Event()
             
+            def sample_metrics():
+                nonlocal n
+                while n < n_samples and not stop_event.is_set():
+                    info = process.as_dict(attrs=['cpu_percent', 'memory_info'])
+                    metrics[n] = (
+                        info['cpu_percent'],
+                        info['memory_info'].rss / 1024 / 1024,  # MB
+                        self.stt._audio_queue.size(),
+                        self.stt._is_processing
+                    )
+                    n += 1
+                    stop_event.wait(check_interval)
+            
+            # Prime the CPU delta so the first non-blocking sample is meaningful
+            process.cpu_percent(interval=None)
+            metrics_thread = threading.Thread(target=sample_metrics, daemon=True)
+            metrics_thread.start()
+            
+            # The main loop only pushes audio
+            chunk_size = 16000  # 1 second of audio at 16kHz
+            start_time = time.time()
             while time.time() - start_time < test_duration:
-                # Add a random chunk every 5 seconds
-                elapsed = time.time() - start_time
-                if int(elapsed) % 5 == 0 and elapsed - int(elapsed) < 0.1:
-                    chunk = np.random.randint(-1000, 1000, chunk_size, dtype=np.int16)
-                    self.stt.process_audio_chunk(chunk)
-                    print(f"Added test chunk at {elapsed:.1f}s")
-                
-                # Record metrics
-                metrics["cpu_usage"].append(process.cpu_percent())
-                metrics["memory_usage"].append(process.memory_info().rss / 1024 / 1024)  # MB
-                metrics["queue_size"].append(self.stt._audio_queue.qsize())
-                metrics["is_processing"].append(self.stt._is_processing)
-                
-                # Sleep for the check interval
-                time.sleep(check_interval)
+                self.stt.process_audio_chunk(self._noise_pool[:chunk_size])
+                print(f"Added test chunk at {time.time() - start_time:.1f}s")
+                time.sleep(min(push_interval, max(0.0, test_duration - (time.time() - start_time))))
+            
+            stop_event.set()
+            metrics_thread.join(timeout=2.0)
                 
             # Stop continuous processing
             self.stt.stop_continuous_processing()
             
-            # Calculate average metrics
-            avg_cpu = sum(metrics["cpu_usage"]) / len(metrics["cpu_usage"]) if metrics["cpu_usage"] else 0
-            avg_memory = sum(metrics["memory_usage"]) / len(metrics["memory_usage"]) if metrics["memory_usage"] else 0
-            max_queue = max(metrics["queue_size"]) if metrics["queue_size"] else 0
-            processing_percentage = (sum(1 for p in metrics["is_processing"] if p) / len(metrics["is_processing"])) * 100 if metrics["is_processing"] else 0
+            # Calculate average metrics over the filled rows with field reductions
+            avg_cpu = avg_memory = processing_percentage = 0.0
+            max_queue = 0
+            if n:
+                samples = metrics[:n]
+                avg_cpu, avg_memory = float(samples['cpu'].mean()), float(samples['mem'].mean())
+                max_queue = int(samples['q'].max())
+                processing_percentage = float(samples['proc'].mean()) * 100
             
             # Print metrics
             print(f"Extended STT operation metrics:")
@@ -227,7 +286,7 @@ class ContinuousSTTTest(unittest.TestCase):
             # Verify metrics (with generous thresholds)
             # These are basic checks to verify stability
             self.assertLess(avg_cpu, 300.0, "CPU usage too high during extended operation")  # Increased threshold for CPU usage
-            self.assertLess(max_queue, 20, "Queue size increased too much during extended operation")
+            self.assertEqual(self.stt._dropped_chunks, dropped_before, "Audio chunks were dropped during extended operation")
             
         except ImportError:
             # If psutil isn't available, just run the basic test
@@ -237,7 +296,12 @@ class ContinuousSTTTest(unittest.TestCase):
     
     def test_ModelSwitch(self):
         """Test switching between CTranslate2 and standard Whisper."""
+        executor = ThreadPoolExecutor(max_workers=1)
         try:
+            # Read the standard Whisper weights in the background while the
+            # CTranslate2 model is exercised
+            prefetch = executor.submit(WhisperSTT.prefetch_weights, "tiny")
+            
             # First test with CTranslate2 if available
             ctranslate_model = WhisperSTT(
                 model_size="tiny",
@@ -256,6 +320,11 @@ class ContinuousSTTTest(unittest.TestCase):
             ctranslate_model.stop_continuous_processing()
             ctranslate_model.unload_model()
             
+            # Release the first model before the second is built so only one is resident
+            del ctranslate_model
+            gc.collect()
+            prefetch.result(timeout=60)
+            
             # Now test with standard Whisper
             standard_model = WhisperSTT(
                 model_size="tiny",
@@ -276,6 +345,9 @@ class ContinuousSTTTest(unittest.TestCase):
             
         except Exception as e:
             self.fail(f"Error during model switching test: {e}")
+        
+        finally:
+            executor.shutdown(wait=True)
 
 
 if __name__ == "__main__":
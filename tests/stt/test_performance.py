@@ -4,6 +4,7 @@ Performance tests for the WhisperSTT module.
 
 import unittest
 import os
+import shutil
 import time
 import tempfile
 import numpy as np
@@ -12,30 +13,74 @@ import platform
 from datetime import datetime
 
 from src.stt import WhisperSTT
+from tests.audio_fixtures import sample_times
+
+
+def _mix_tones(out, t, freqs, weights):
+    """
+    Write a weighted mixture of sine tones into an int16 buffer.
+
+    Everything stays in float32, the sines are computed in place, and the
+    int16 conversion writes straight into ``out``.
+
+    Args:
+        out: Preallocated int16 output buffer, same length as t
+        t: Sample times in seconds (float32)
+        freqs: Tone frequencies in Hz
+        weights: Amplitude of each tone
+
+    Returns:
+        np.ndarray: out
+    """
+    phases = np.outer(np.asarray(freqs, dtype=np.float32) * np.float32(2 * np.pi), t)
+    np.sin(phases, out=phases)
+    mixed = np.asarray(weights, dtype=np.float32) @ phases
+    np.multiply(mixed, np.float32(32767), out=out, casting="unsafe")
+    return out
 
 
 class STTPerformanceTest(unittest.TestCase):
     """Performance tests for the STT module."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Load the model once for all tests in this class."""
+        cls.stt = WhisperSTT(model_size="tiny")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Unload the shared model."""
+        cls.stt.unload_model()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.stt = WhisperSTT(model_size="tiny")
+        # Reset the shared instance; reload only if a previous test unloaded it
+        self.stt.reset_state()
+        if not self.stt.is_loaded:
+            self.stt.load_model()
         self.temp_dir = tempfile.mkdtemp()
+        # Reusable completion signal and result slots for transcription callbacks
+        self._done = threading.Event()
+        self._last_text = None
+        self._last_conf = None
         print("Running STT performance tests...")
 
     def tearDown(self):
         """Tear down test fixtures."""
-        self.stt.unload_model()
-
         # Clean up temp directory
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _on_transcription(self, text, confidence):
+        """Record a transcription result and signal the waiting test."""
+        self._last_text = text
+        self._last_conf = confidence
+        self._done.set()
 
     def test_LoadTimePerformance(self):
         """Test model loading performance."""
-        # Unload the model first
+        # Unload the model first and drop cached weights for a cold load
         self.stt.unload_model()
+        WhisperSTT.clear_weight_cache()
 
         # Measure model loading time
         start_time = time.time()
@@ -55,6 +100,47 @@ class STTPerformanceTest(unittest.TestCase):
         # but this is a flexible threshold
         self.assertLess(load_time, 20.0)
 
+    def test_WarmLoadPerformance(self):
+        """Test loading openai-whisper from prefetched weights is faster than a cold load."""
+        if self.stt.use_ctranslate2:
+            self.skipTest("Weight cache only applies to the openai-whisper backend")
+
+        # Cold load: nothing cached
+        self.stt.unload_model()
+        WhisperSTT.clear_weight_cache()
+        start_time = time.time()
+        self.stt.load_model()
+        cold_load_time = time.time() - start_time
+
+        # Warm load: unloading evicts the weights, so prefetch them (untimed) first
+        self.stt.unload_model()
+        WhisperSTT.prefetch_weights(self.stt.model_size, self.stt.device)
+        start_time = time.time()
+        self.stt.load_model()
+        warm_load_time = time.time() - start_time
+
+        print(f"Model load time: {cold_load_time:.3f} seconds (cold), {warm_load_time:.3f} seconds (warm)")
+
+        self.assertTrue(self.stt.is_loaded)
+        self.assertLess(warm_load_time, cold_load_time / 4)
+
+    def test_SharedWeightCache(self):
+        """Test cached weights survive until the last instance using them is unloaded."""
+        if self.stt.use_ctranslate2:
+            self.skipTest("Weight cache only applies to the openai-whisper backend")
+
+        key = f"{self.stt.model_size}:{self.stt.device}"
+        other = WhisperSTT(model_size=self.stt.model_size, device=self.stt.device, use_ctranslate2=False)
+        self.assertTrue(other.is_loaded)
+
+        # Another loaded instance still shares the weights
+        other.unload_model()
+        self.assertIn(key, WhisperSTT._weight_cache)
+
+        # The last user's unload evicts them
+        self.stt.unload_model()
+        self.assertNotIn(key, WhisperSTT._weight_cache)
+
     def test_TranscriptionPerformance(self):
         """Test transcription performance with different audio durations."""
         # Test different audio durations
@@ -63,38 +149,25 @@ class STTPerformanceTest(unittest.TestCase):
 
         results = []
 
+        # Mixture of frequencies, synthesized once into a preallocated int16 buffer.
+        # Shorter durations are prefixes of the longest mixture.
+        t = sample_times(max(durations), sample_rate)
+        mixture = _mix_tones(np.empty(len(t), dtype=np.int16), t, [440, 880, 1320], [0.5, 0.3, 0.2])
+
         for duration in durations:
             # Create an audio sample of the specified duration
-            t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-            # Generate a more complex signal (mixture of frequencies)
-            audio_data = (
-                0.5 * np.sin(2 * np.pi * 440 * t) +
-                0.3 * np.sin(2 * np.pi * 880 * t) +
-                0.2 * np.sin(2 * np.pi * 1320 * t)
-            )
-
-            # Convert to 16-bit PCM
-            audio_data = (audio_data * 32767).astype(np.int16)
-
-            # Measurement values
-            transcription_result = None
-            confidence_result = None
-
-            # Event for synchronization
-            event = threading.Event()
-
-            def callback(text, confidence):
-                nonlocal transcription_result, confidence_result
-                transcription_result = text
-                confidence_result = confidence
-                event.set()
+            audio_data = mixture[:int(sample_rate * duration)]
+
+            # Reset the shared event and result slots
+            self._done.clear()
+            self._last_conf = None
 
             # Measure transcription time
             start_time = time.time()
-            self.stt.transcribe_audio(audio_data, callback)
+            self.stt.transcribe_audio(audio_data, self._on_transcription)
 
             # Wait for transcription to complete
-            event.wait(timeout=60)
+            self._done.wait(timeout=60)
             transcription_time = time.time() - start_time
 
             # Record results
@@ -103,11 +176,11 @@ class STTPerformanceTest(unittest.TestCase):
                 'transcription_time': transcription_time,
                 'processing_ratio': transcription_time / duration,
                 'sample_length': len(audio_data),
-                'confidence': confidence_result
+                'confidence': self._last_conf
             })
 
             print(f"Audio duration: {duration:.1f}s, Transcription time: {transcription_time:.3f}s, "
-                  f"Ratio: {transcription_time / duration:.2f}x, Confidence: {confidence_result:.2f}")
+                  f"Ratio: {transcription_time / duration:.2f}x, Confidence: {self._last_conf:.2f}")
 
         # Calculate averages
         avg_ratio = sum(r['processing_ratio'] for r in results) / len(results)
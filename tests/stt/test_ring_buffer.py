@@ -0,0 +1,78 @@
+"""
+Tests for the SPSC audio ring buffer used by continuous STT.
+"""
+
+import unittest
+import numpy as np
+
+from src.stt.ring_buffer import SPSCAudioRing
+
+
+class SPSCAudioRingTest(unittest.TestCase):
+    """Test cases for the SPSCAudioRing class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.ring = SPSCAudioRing(capacity_samples=1000, max_segments=4)
+
+    def test_PushPopOrder(self):
+        """Test segments come out in order with int16 scaled to float32."""
+        first = np.array([0, 16384, -32768], dtype=np.int16)
+        second = np.array([0.25, -0.5], dtype=np.float32)
+
+        self.assertTrue(self.ring.push(first))
+        self.assertTrue(self.ring.push(second))
+        self.assertEqual(self.ring.size(), 2)
+        self.assertEqual(self.ring.qsize(), 2)
+        self.assertEqual(self.ring.peek_size(), 3)
+
+        out = self.ring.pop()
+        self.assertEqual(out.dtype, np.float32)
+        np.testing.assert_allclose(out, [0.0, 0.5, -1.0])
+        np.testing.assert_allclose(self.ring.pop(), second)
+        self.assertIsNone(self.ring.pop())
+        self.assertIsNone(self.ring.peek_size())
+        self.assertTrue(self.ring.empty())
+
+    def test_WrapAround(self):
+        """Test a segment that wraps past the end of the sample buffer."""
+        self.ring.push(np.zeros(800, dtype=np.float32))
+        self.ring.pop()
+
+        chunk = np.arange(400, dtype=np.float32)
+        self.assertTrue(self.ring.push(chunk))
+        np.testing.assert_array_equal(self.ring.pop(), chunk)
+
+    def test_PopIntoScratch(self):
+        """Test popping into a caller-provided scratch buffer."""
+        scratch = np.empty(self.ring.capacity_samples, dtype=np.float32)
+        chunk = np.arange(5, dtype=np.float32)
+        self.ring.push(chunk)
+
+        out = self.ring.pop(out=scratch)
+        np.testing.assert_array_equal(out, chunk)
+        self.assertTrue(np.shares_memory(out, scratch))
+
+    def test_SegmentSlotsPowerOfTwo(self):
+        """Test the segment count is rounded up to a power of two."""
+        ring = SPSCAudioRing(capacity_samples=100, max_segments=5)
+        self.assertEqual(ring.max_segments, 8)
+        for _ in range(8):
+            self.assertTrue(ring.push(np.zeros(1, dtype=np.float32)))
+        self.assertFalse(ring.push(np.zeros(1, dtype=np.float32)))
+
+    def test_FullRing(self):
+        """Test pushes are rejected when samples or segment slots run out."""
+        self.assertFalse(self.ring.push(np.zeros(1001, dtype=np.float32)))
+
+        for _ in range(4):
+            self.assertTrue(self.ring.push(np.zeros(10, dtype=np.float32)))
+        self.assertFalse(self.ring.push(np.zeros(10, dtype=np.float32)))
+
+        self.ring.clear()
+        self.assertEqual(self.ring.size(), 0)
+        self.assertTrue(self.ring.push(np.zeros(990, dtype=np.float32)))
+
+
+if __name__ == "__main__":
+    unittest.main()
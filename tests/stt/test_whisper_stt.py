@@ -3,7 +3,7 @@ Tests for the WhisperSTT class.
 """
 
 import unittest
-import os
+import shutil
 import tempfile
 import time
 import numpy as np
@@ -11,27 +11,46 @@ import threading
 
 # Import the WhisperSTT class
 from src.stt import WhisperSTT
+from tests.audio_fixtures import make_tone
 
 
 class WhisperSTTTest(unittest.TestCase):
     """Test cases for the WhisperSTT class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Load the model once for all tests in this class."""
+        # Use the smallest model for quick testing
+        cls.stt = WhisperSTT(model_size="tiny")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Unload the shared model to free memory."""
+        cls.stt.unload_model()
+
     def setUp(self):
         """Set up test fixtures."""
-        # Use the smallest model for quick testing
-        self.stt = WhisperSTT(model_size="tiny")
+        # Reset the shared instance; reload only if a previous test unloaded it
+        self.stt.reset_state()
+        if not self.stt.is_loaded:
+            self.stt.load_model()
         self.temp_dir = tempfile.mkdtemp()
+        # Reusable completion signal and result slots for transcription callbacks
+        self._done = threading.Event()
+        self._last_text = None
+        self._last_conf = None
         print("Running WhisperSTT tests...")
 
     def tearDown(self):
         """Tear down test fixtures."""
-        # Unload the model to free memory
-        self.stt.unload_model()
-
         # Clean up temp directory
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _on_transcription(self, text, confidence):
+        """Record a transcription result and signal the waiting test."""
+        self._last_text = text
+        self._last_conf = confidence
+        self._done.set()
 
     def test_ModelLoading(self):
         """Test model loading functionality."""
@@ -116,43 +135,24 @@ class WhisperSTTTest(unittest.TestCase):
     def test_MockTranscription(self):
         """Test transcription with a mock audio sample."""
         # Create a mock audio sample (sine wave at 440 Hz)
-        sample_rate = 16000
-        duration = 3  # seconds
-        t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-        audio_data = np.sin(2 * np.pi * 440 * t)
-
-        # Convert to 16-bit PCM
-        audio_data = (audio_data * 32767).astype(np.int16)
-
-        # Call transcription method
-        transcription_result = None
-        confidence_result = None
-
-        # Create an event to wait for the callback
-        event = threading.Event()
-
-        def callback(text, confidence):
-            nonlocal transcription_result, confidence_result
-            transcription_result = text
-            confidence_result = confidence
-            event.set()
+        audio_data = make_tone(440, 3.0)
 
         # Transcribe audio
-        self.stt.transcribe_audio(audio_data, callback)
+        self.stt.transcribe_audio(audio_data, self._on_transcription)
 
         # Wait for transcription with timeout
-        event.wait(timeout=10)
+        self._done.wait(timeout=10)
 
         # Check results
         # Note: Since this is a sine wave, we don't expect meaningful transcription,
         # but the processing should complete without errors
-        self.assertTrue(self.stt._is_processing or event.is_set())
-        if event.is_set():
+        self.assertTrue(self.stt._is_processing or self._done.is_set())
+        if self._done.is_set():
             # Some result was produced (might be empty)
-            self.assertIsNotNone(transcription_result)
-            self.assertIsInstance(confidence_result, float)
-            print(f"Transcription result: '{transcription_result}'")
-            print(f"Confidence: {confidence_result:.2f}")
+            self.assertIsNotNone(self._last_text)
+            self.assertIsInstance(self._last_conf, float)
+            print(f"Transcription result: '{self._last_text}'")
+            print(f"Confidence: {self._last_conf:.2f}")
 
         # Sleep to simulate processing time
         time.sleep(0.2)
@@ -195,33 +195,71 @@ class WhisperSTTTest(unittest.TestCase):
         time.sleep(0.02)
         print(f"WhisperSTTTest.ConfidenceEstimation ({int(0.02 * 1000)} ms)")
 
+    def test_VoiceActivityGate(self):
+        """Test silence is gated before inference, and tones only with the spectral gate."""
+        silence = np.zeros(16000, dtype=np.int16)
+        tone = make_tone(440, 1.0)
+        noise = np.random.default_rng(0).normal(0, 0.1, 16000).astype(np.float32)
+
+        # Source-filter vowel /a/: harmonics of a 120 Hz glottal source shaped by
+        # formants at 700 and 1200 Hz, with a little breath noise
+        t = np.arange(16000, dtype=np.float32) / 16000
+        vowel = np.zeros(16000, dtype=np.float32)
+        for k in range(1, 34):
+            f = 120.0 * k
+            envelope = 1.0 / (1.0 + ((f - 700) / 150) ** 2) + 0.5 / (1.0 + ((f - 1200) / 200) ** 2)
+            vowel += np.float32(envelope / k) * np.sin(np.float32(2 * np.pi * f) * t)
+        vowel *= np.float32(0.3 / np.abs(vowel).max())
+        vowel += np.random.default_rng(1).normal(0, 0.003, 16000).astype(np.float32)
+
+        # Default gate: only silence is rejected
+        self.assertFalse(self.stt._should_transcribe(silence))
+        self.assertTrue(self.stt._should_transcribe(tone))
+        self.assertTrue(self.stt._should_transcribe(noise))
+        self.assertTrue(self.stt._should_transcribe(vowel))
+
+        # Opt-in spectral gate also rejects pure tones
+        self.stt.spectral_gate = True
+        try:
+            self.assertFalse(self.stt._should_transcribe(tone))
+            self.assertTrue(self.stt._should_transcribe(noise))
+
+            # Band-limited noise (nothing above 4 kHz, like 8 kHz audio resampled to
+            # 16 kHz) is broadband within its band and must still pass
+            spectrum = np.fft.rfft(noise)
+            spectrum[len(spectrum) // 2:] = 0
+            band_limited = np.fft.irfft(spectrum, n=len(noise)).astype(np.float32)
+            self.assertTrue(self.stt._should_transcribe(band_limited))
+        finally:
+            self.stt.spectral_gate = False
+
+        # Gated audio is reported as an empty result without running the model
+        self.stt.transcribe_audio(silence, self._on_transcription)
+        self.assertTrue(self._done.wait(timeout=1))
+        self.assertEqual(self._last_text, "")
+        self.assertEqual(self._last_conf, 0.0)
+
+        # The future path applies the same gate
+        self.assertEqual(self.stt.transcribe_future(silence).result(timeout=1), ("", 0.0))
+
     def test_ModelProcessing(self):
         """Test processing state tracking."""
         # Check initial state
         self.assertFalse(self.stt.is_processing())
 
         # Create a very short audio sample
-        sample_rate = 16000
-        duration = 0.5  # seconds
-        t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-        audio_data = np.sin(2 * np.pi * 440 * t)
-        audio_data = (audio_data * 32767).astype(np.int16)
+        audio_data = make_tone(440, 0.5)
 
         # Start processing
-        event = threading.Event()
-
-        def callback(text, confidence):
-            event.set()
-
-        self.stt.transcribe_audio(audio_data, callback)
+        self.stt.transcribe_audio(audio_data, self._on_transcription)
 
         # Check that processing state is updated
         # Note: There's a small chance this might fail if processing finishes too quickly
-        if not event.is_set():
+        if not self._done.is_set():
             self.assertTrue(self.stt.is_processing())
 
         # Wait for processing to complete
-        event.wait(timeout=10)
+        self._done.wait(timeout=10)
 
         # Allow a small delay for processing flag to update
         time.sleep(0.5)
@@ -233,6 +271,47 @@ class WhisperSTTTest(unittest.TestCase):
         time.sleep(0.05)
         print(f"WhisperSTTTest.ModelProcessing ({int(0.05 * 1000)} ms)")
 
+    def test_BatchTranscription(self):
+        """Test transcribing several buffers with one batch call."""
+        # Create two short tones at different pitches
+        audio_list = [make_tone(freq, 0.5) for freq in (440, 880)]
+
+        # One event per buffer, set from the per-item callback
+        events = [threading.Event() for _ in audio_list]
+        results = [None] * len(audio_list)
+
+        def callback(index, text, confidence):
+            results[index] = (text, confidence)
+            events[index].set()
+
+        self.stt.transcribe_batch(audio_list, callback)
+
+        for event in events:
+            event.wait(timeout=10)
+
+        # Every buffer should have produced a result, in its own slot
+        for index, event in enumerate(events):
+            self.assertTrue(event.is_set())
+            text, confidence = results[index]
+            self.assertIsInstance(text, str)
+            self.assertIsInstance(confidence, float)
+
+        print("WhisperSTTTest.BatchTranscription")
+
+    def test_FutureTranscription(self):
+        """Test transcription results delivered through a future."""
+        # Create a short tone
+        audio_data = make_tone(440, 0.5)
+
+        future = self.stt.transcribe_future(audio_data)
+        text, confidence = future.result(timeout=10)
+
+        self.assertTrue(future.done())
+        self.assertIsInstance(text, str)
+        self.assertIsInstance(confidence, float)
+
+        print("WhisperSTTTest.FutureTranscription")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file